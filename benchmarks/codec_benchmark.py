@@ -0,0 +1,118 @@
+"""Benchmark the JSON codecs on firmware 2.8.0 multireq traffic.
+
+The request payloads and response bodies are read from a capture of a
+DaikinBRP280 (see replay_benchmark.py). Without capture, a status cycle shaped
+like the one of a real adapter is used.
+
+Usage: python benchmarks/codec_benchmark.py [capture.jsonl] [runs]
+"""
+
+import json
+import os
+import sys
+import timeit
+
+sys.path.insert(
+    0, os.path.join(os.path.dirname(__file__), "..", "custom_components", "custom_daikin")
+)
+
+# pylint: disable=wrong-import-position
+from pydaikin.codec import CODECS, get_codec  # noqa: E402
+
+
+def _node(name, value=None, children=None):
+    if children is None:
+        return {"pn": name, "pt": 3, "pv": value, "md": {"pt": "s", "st": 1}}
+    return {"pn": name, "pch": children}
+
+
+def sample_cycle():
+    """Return the payload and response body of a status update."""
+    indoor = _node(
+        "dgc_status",
+        children=[
+            _node(
+                "e_1002",
+                children=[
+                    _node("e_A002", children=[_node("p_01", "01")]),
+                    _node(
+                        "e_3001",
+                        children=[_node("p_01", "0200")]
+                        + [_node(f"p_{i:02X}", "2c00") for i in range(2, 0x2A)],
+                    ),
+                    _node("e_A00B", children=[_node("p_01", "16"), _node("p_02", "32")]),
+                ],
+            ),
+            _node("e_1003", children=[_node(f"p_{i:02X}", "0000") for i in range(1, 0x20)]),
+        ],
+    )
+    outdoor = _node(
+        "dgc_status",
+        children=[_node("e_1003", children=[_node("e_A00D", children=[_node("p_01", "14")])])],
+    )
+    week_power = _node(
+        "week_power",
+        children=[
+            _node("today_runtime", "312"),
+            _node("datas", [120, 340, 80, 0, 410, 220, 95]),
+        ],
+    )
+    targets = [
+        ("/dsiot/edge/adr_0100.dgc_status", indoor),
+        ("/dsiot/edge/adr_0200.dgc_status", outdoor),
+        ("/dsiot/edge/adr_0100.i_power.week_power", week_power),
+    ]
+    payload = {"requests": [{"op": 2, "to": f"{to}?filter=pv,pt,md"} for to, _ in targets]}
+    body = json.dumps({"responses": [{"fr": to, "rsc": 2000, "pc": pc} for to, pc in targets]})
+    return payload, body
+
+
+def captured_cycles(path):
+    """Return the payloads and response bodies of the multireq of a capture."""
+    cycles = []
+    with open(path, encoding="utf-8") as file:
+        for line in file:
+            record = json.loads(line)
+            if record["d"] == "DaikinBRP280" and record["m"] == "POST" and record["b"]:
+                cycles.append((record["q"], record["b"]))
+    if not cycles:
+        raise ValueError(f"No multireq traffic in {path}")
+    return cycles
+
+
+def main(cycles, runs):
+    """Print the time to encode the payloads and decode the bodies with each codec."""
+    payloads = [payload for payload, _ in cycles]
+    bodies = [body.encode() for _, body in cycles]
+    size = sum(len(body) for body in bodies) / len(bodies)
+    print(f"{len(cycles)} multireq, {size:.0f} bytes per response on average")
+    results = {}
+    for name in CODECS:
+        try:
+            codec = get_codec(name)
+        except ImportError:
+            print(f"{name:>8}: not installed")
+            continue
+        encode = min(
+            timeit.repeat(lambda: [codec.dumps(p) for p in payloads], number=runs, repeat=5)
+        )
+        decode = min(
+            timeit.repeat(lambda: [codec.loads(b) for b in bodies], number=runs, repeat=5)
+        )
+        per_request = 1e6 / (runs * len(cycles))
+        results[name] = decode
+        print(
+            f"{name:>8}: encode {encode * per_request:6.2f}us, "
+            f"decode {decode * per_request:6.2f}us per request"
+        )
+    if "json" in results:
+        for name, decode in results.items():
+            if name != "json":
+                print(f"{name:>8}: {results['json'] / decode:.1f}x faster decoding than json")
+
+
+if __name__ == "__main__":
+    main(
+        captured_cycles(sys.argv[1]) if len(sys.argv) > 1 else [sample_cycle()],
+        int(sys.argv[2]) if len(sys.argv) > 2 else 2000,
+    )
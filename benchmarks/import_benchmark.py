@@ -0,0 +1,69 @@
+"""Benchmark the import time of pydaikin entry points.
+
+Each module is imported in a fresh interpreter with -X importtime, the
+cumulative time of the module and the pydaikin modules it loaded are reported.
+
+Usage: python benchmarks/import_benchmark.py [runs] [module ...]
+"""
+
+import os
+import statistics
+import subprocess
+import sys
+
+PACKAGE_DIR = os.path.join(
+    os.path.dirname(__file__), "..", "custom_components", "custom_daikin"
+)
+
+MODULES = [
+    "pydaikin.factory",
+    "pydaikin.daikin_brp069",
+    "pydaikin.daikin_brp_280",
+    "pydaikin.daikin_skyfi",
+    "pydaikin.discovery",
+]
+
+
+def import_time(module):
+    """Return the cumulative import time of a module in seconds and the pydaikin
+    modules loaded with it."""
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        cwd=PACKAGE_DIR,
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    cumulative = None
+    loaded = []
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "|" not in line:
+            continue
+        _, cumulative_us, name = line[len("import time:") :].split("|")
+        name = name.strip()
+        if name.startswith("pydaikin."):
+            loaded.append(name)
+        if name == module:
+            cumulative = int(cumulative_us) / 1e6
+    return cumulative, loaded
+
+
+def main(runs, modules):
+    """Print the median import time of each module."""
+    for module in modules:
+        times = []
+        for _ in range(runs):
+            cumulative, loaded = import_time(module)
+            times.append(cumulative)
+        print(
+            f"{module:>24}: {statistics.median(times) * 1000:7.1f}ms "
+            f"(median of {runs}), {len(loaded)} pydaikin modules"
+        )
+        print(f"{'':>26}{', '.join(name[len('pydaikin.'):] for name in loaded)}")
+
+
+if __name__ == "__main__":
+    main(
+        int(sys.argv[1]) if len(sys.argv) > 1 else 5,
+        sys.argv[2:] or MODULES,
+    )
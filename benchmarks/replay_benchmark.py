@@ -0,0 +1,80 @@
+"""Benchmark a driver against a wire capture, without hardware.
+
+Record a capture by setting a CaptureRecorder as the `recorder` of an
+appliance (or of the Appliance class), then replay it:
+
+Usage: python benchmarks/replay_benchmark.py capture.jsonl [cycles] [device_ip]
+"""
+
+import asyncio
+import json
+import os
+import sys
+import time
+
+sys.path.insert(
+    0, os.path.join(os.path.dirname(__file__), "..", "custom_components", "custom_daikin")
+)
+
+# pylint: disable=wrong-import-position
+from pydaikin.capture import ReplayTransport  # noqa: E402
+from pydaikin.daikin_airbase import DaikinAirBase  # noqa: E402
+from pydaikin.daikin_brp069 import DaikinBRP069  # noqa: E402
+from pydaikin.daikin_brp072c import DaikinBRP072C  # noqa: E402
+from pydaikin.daikin_brp_280 import DaikinBRP280  # noqa: E402
+from pydaikin.daikin_skyfi import DaikinSkyFi  # noqa: E402
+
+DRIVERS = {
+    cls.__name__: cls
+    for cls in (DaikinAirBase, DaikinBRP069, DaikinBRP072C, DaikinBRP280, DaikinSkyFi)
+}
+
+
+def first_record(path, device_ip=None):
+    """Return the first record of the capture, for the given device if any."""
+    with open(path, encoding="utf-8") as file:
+        for line in file:
+            record = json.loads(line)
+            if device_ip is None or record["ip"] == device_ip:
+                return record
+    raise ValueError(f"No record for {device_ip} in {path}")
+
+
+async def main(path, cycles, device_ip=None):
+    """Replay the capture through the driver which recorded it."""
+    record = first_record(path, device_ip)
+    cls = DRIVERS[record["d"]]
+    kwargs = {"password": ""} if cls is DaikinSkyFi else {}
+
+    async with cls(record["ip"], **kwargs) as appliance:
+        appliance.transport = ReplayTransport(path, record["ip"])
+        if cls is DaikinSkyFi:
+            # Replay at full speed, there is no controller to pace
+            appliance.pacer = None
+        await appliance.init()
+
+        start = time.perf_counter()
+        for _ in range(cycles):
+            # Reading every value marks every resource to be updated again
+            for key in list(appliance.values):
+                appliance.values.get(key)
+            await appliance.update_status()
+        elapsed = time.perf_counter() - start
+
+    print(
+        f"{cls.__name__} {record['ip']}: {cycles} update cycles in {elapsed:.3f}s, "
+        f"{elapsed / cycles * 1e6:.0f}us/cycle"
+    )
+
+
+if __name__ == "__main__":
+    if len(sys.argv) < 2:
+        # There is nothing to replay without a capture
+        sys.exit(__doc__.strip())
+    asyncio.run(
+        main(
+            sys.argv[1],
+            int(sys.argv[2]) if len(sys.argv) > 2 else 1000,
+            sys.argv[3] if len(sys.argv) > 3 else None,
+        )
+    )
@@ -0,0 +1,84 @@
+"""Benchmark the lightweight BRP069 transport against the aiohttp path.
+
+A local server emulating a BRP069 adapter answers get_sensor_info and
+get_control_info, both transports poll it the same number of times.
+
+Usage: python benchmarks/transport_benchmark.py [polls]
+"""
+
+import asyncio
+import os
+import sys
+import time
+
+sys.path.insert(
+    0, os.path.join(os.path.dirname(__file__), "..", "custom_components", "custom_daikin")
+)
+
+from pydaikin.daikin_brp069 import DaikinBRP069  # noqa: E402 pylint: disable=wrong-import-position
+
+RESPONSES = {
+    "/aircon/get_sensor_info": "ret=OK,htemp=22.0,hhum=-,otemp=15.0,err=0,cmpfreq=20",
+    "/aircon/get_control_info": (
+        "ret=OK,pow=1,mode=3,adv=,stemp=21.0,shum=0,dt1=25.0,dt2=M,dt3=21.0,dt4=25.0,"
+        "dt5=25.0,dt7=25.0,dh1=AUTO,dh2=50,dh3=0,dh4=0,dh5=0,dh7=AUTO,dhh=50,b_mode=3,"
+        "b_stemp=21.0,b_shum=0,alert=255,f_rate=A,f_dir=0,b_f_rate=A,b_f_dir=0,"
+        "dfr1=5,dfr2=5,dfr3=A,dfr4=5,dfr5=5,dfr6=5,dfr7=5,dfrh=5,dfd1=0,dfd2=0,dfd3=0,"
+        "dfd4=0,dfd5=0,dfd6=0,dfd7=0,dfdh=0"
+    ),
+}
+
+
+async def handle(reader, writer):
+    """Answer keep-alive requests like a BRP069 adapter."""
+    try:
+        while True:
+            head = await reader.readuntil(b"\r\n\r\n")
+            target = head.split(b" ", 2)[1].decode().split("?")[0]
+            body = RESPONSES.get(target, "ret=PARAM NG").encode()
+            writer.write(
+                b"HTTP/1.1 200 OK\r\nContent-Type: text/plain\r\n"
+                + f"Content-Length: {len(body)}\r\n\r\n".encode()
+                + body
+            )
+            await writer.drain()
+    except (asyncio.IncompleteReadError, ConnectionError):
+        writer.close()
+
+
+async def run(appliance, polls):
+    """Poll the emulated adapter and return the elapsed time."""
+    start = time.perf_counter()
+    for _ in range(polls):
+        for resource in appliance.INFO_RESOURCES:
+            await appliance._get_resource(resource)  # pylint: disable=protected-access
+    return time.perf_counter() - start
+
+
+async def main(polls):
+    """Run both transports against the same server."""
+    server = await asyncio.start_server(handle, "127.0.0.1", 0)
+    port = server.sockets[0].getsockname()[1]
+
+    results = {}
+    for name, lean in (("aiohttp", False), ("lean", True)):
+        async with DaikinBRP069("127.0.0.1") as appliance:
+            appliance.base_url = f"http://127.0.0.1:{port}"
+            appliance.use_lean_transport(lean)
+            await run(appliance, 10)  # warm up
+            results[name] = await run(appliance, polls)
+
+    server.close()
+    await server.wait_closed()
+
+    requests = polls * len(DaikinBRP069.INFO_RESOURCES)
+    for name, elapsed in results.items():
+        print(
+            f"{name:>8}: {elapsed:.3f}s for {requests} requests, "
+            f"{elapsed / requests * 1e6:.0f}us/request"
+        )
+    print(f" speedup: {results['aiohttp'] / results['lean']:.2f}x")
+
+
+if __name__ == "__main__":
+    asyncio.run(main(int(sys.argv[1]) if len(sys.argv) > 1 else 1000))
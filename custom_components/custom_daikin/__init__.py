@@ -1,56 +1,247 @@
 """The Custom Daikin integration."""
 import asyncio
+from datetime import datetime
 import logging
 
+from aiohttp import ClientError, ClientResponseError
+from aiohttp.web_exceptions import HTTPForbidden, HTTPNotFound
+import voluptuous as vol
+
 from homeassistant.config_entries import ConfigEntry
 from homeassistant.const import CONF_API_KEY, CONF_HOST, CONF_PASSWORD, CONF_UUID
-from homeassistant.core import HomeAssistant
-from homeassistant.exceptions import ConfigEntryNotReady
+from homeassistant.core import HomeAssistant, ServiceCall
+from homeassistant.exceptions import ConfigEntryError, ConfigEntryNotReady
+import homeassistant.helpers.config_validation as cv
 from homeassistant.helpers.aiohttp_client import async_get_clientsession
+from homeassistant.helpers.storage import Store
+
+from .const import (
+    DATA_DISCOVERY,
+    DATA_READY,
+    DATA_SETUP,
+    DOMAIN,
+    PLATFORMS,
+    SERVICE_PROFILE,
+    SETUP_PARALLELISM,
+    SETUP_RETRY,
+    SETUP_RETRY_MAX,
+    STORAGE_SAVE_DELAY,
+    STORAGE_VERSION,
+)
+
+ATTR_DURATION = "duration"
+ATTR_THRESHOLD = "threshold"
 
-from .const import DOMAIN, PLATFORMS
+PROFILE_SCHEMA = vol.Schema(
+    {
+        vol.Optional(ATTR_DURATION, default=60): vol.All(
+            vol.Coerce(float), vol.Range(min=1, max=3600)
+        ),
+        vol.Optional(ATTR_THRESHOLD, default=0.05): cv.positive_float,
+    }
+)
 
 _LOGGER = logging.getLogger(__name__)
 
 
 async def async_setup(hass: HomeAssistant, config):
     """Set up the Custom Daikin component."""
-    hass.data[DOMAIN] = {}
+    from .pydaikin.registration import REGISTRATIONS
+    from .pydaikin.snapshot import SNAPSHOTS
+
+    hass.data[DOMAIN] = {
+        DATA_SETUP: asyncio.Semaphore(SETUP_PARALLELISM),
+        DATA_READY: {},
+    }
+    # BRP072C terminals registered in previous runs do not need registering again
+    registrations = Store(hass, STORAGE_VERSION, f"{DOMAIN}.registrations")
+    REGISTRATIONS.load(await registrations.async_load())
+    REGISTRATIONS.on_change = lambda: registrations.async_delay_save(
+        REGISTRATIONS.as_dict, STORAGE_SAVE_DELAY
+    )
+    # Appliances start from their last known values, see _async_restore_appliance
+    snapshots = Store(hass, STORAGE_VERSION, f"{DOMAIN}.snapshots")
+    SNAPSHOTS.load(await snapshots.async_load())
+    SNAPSHOTS.on_change = lambda: snapshots.async_delay_save(
+        SNAPSHOTS.as_dict, STORAGE_SAVE_DELAY
+    )
+
+    async def async_profile(call: ServiceCall):
+        """Profile the Daikin work done on the event loop for a while."""
+        from .climate import DaikinClimate
+        from .pydaikin.profiling import PROFILER
+        from .sensor import DaikinSensor
+
+        path = hass.config.path(
+            f"{DOMAIN}_profile_{datetime.now().strftime('%Y%m%d_%H%M%S')}.jsonl"
+        )
+        summary = await PROFILER.capture(
+            call.data[ATTR_DURATION],
+            path,
+            threshold=call.data[ATTR_THRESHOLD],
+            targets=[(DaikinClimate, "async_update"), (DaikinSensor, "async_update")],
+        )
+        for name, stats in sorted(summary.items()):
+            _LOGGER.info(
+                "%s: %s calls, %.3fs total, %.3fs max",
+                name,
+                stats["count"],
+                stats["total"],
+                stats["max"],
+            )
+
+    hass.services.async_register(
+        DOMAIN, SERVICE_PROFILE, async_profile, schema=PROFILE_SCHEMA
+    )
     return True
 
 
 async def async_setup_entry(hass: HomeAssistant, entry: ConfigEntry):
-    """Set up Custom Daikin from a config entry."""
+    """Set up Custom Daikin from a config entry.
+
+    A device with a snapshot gets its entities at once, from its last known
+    values, and is initialized in the background. They are unavailable until it
+    answers, a dead device does not hold up the startup. A device without
+    snapshot is probed first, Home Assistant sets it up again later if it does
+    not answer."""
+    from .pydaikin.exceptions import DaikinException
     from .pydaikin.factory import DaikinFactory
-    
-    try:
-        host = entry.data[CONF_HOST]
-        password = entry.data.get(CONF_PASSWORD)
-        key = entry.data.get(CONF_API_KEY)
-        uuid = entry.data.get(CONF_UUID)
-        
-        daikin_api = await DaikinFactory(
-            host,
-            async_get_clientsession(hass),
-            password=password,
-            key=key,
-            uuid=uuid
-        )
-        
-        hass.data[DOMAIN][entry.entry_id] = daikin_api
-        
-    except Exception as err:
-        _LOGGER.error("Error connecting to Daikin device: %s", err)
-        raise ConfigEntryNotReady from err
-    
-    for platform in PLATFORMS:
-        hass.async_create_task(
-            hass.config_entries.async_forward_entry_setup(entry, platform)
+    from .pydaikin.snapshot import SNAPSHOTS
+
+    host = entry.data[CONF_HOST]
+    ready = asyncio.Event()
+    daikin_api = await _async_restore_appliance(hass, entry)
+    if daikin_api is None:
+        # Bound the number of devices probed at the same time across entries
+        async with hass.data[DOMAIN][DATA_SETUP]:
+            try:
+                daikin_api = await DaikinFactory(
+                    host, async_get_clientsession(hass), **_credentials(entry)
+                )
+            except (HTTPForbidden, ClientResponseError) as err:
+                if _refused(err):
+                    raise ConfigEntryError(
+                        f"Daikin device {host} refused the credentials"
+                    ) from err
+                raise ConfigEntryNotReady(
+                    f"Error connecting to Daikin device {host}: {err}"
+                ) from err
+            except (
+                ClientError,
+                asyncio.TimeoutError,
+                OSError,
+                DaikinException,
+            ) as err:
+                raise ConfigEntryNotReady(
+                    f"Error connecting to Daikin device {host}: {err}"
+                ) from err
+        ready.set()
+
+    SNAPSHOTS.track(daikin_api, entry.entry_id)
+    hass.data[DOMAIN][entry.entry_id] = daikin_api
+    hass.data[DOMAIN][DATA_READY][entry.entry_id] = ready
+    await _async_track_device_ip(hass, daikin_api)
+    await hass.config_entries.async_forward_entry_setups(entry, PLATFORMS)
+    if not ready.is_set():
+        # Cancelled by Home Assistant when the entry is unloaded
+        entry.async_create_background_task(
+            hass,
+            _async_init_appliance(hass, entry, daikin_api, ready),
+            f"{DOMAIN} init {host}",
         )
-    
     return True
 
 
+def _credentials(entry: ConfigEntry) -> dict:
+    """Return the arguments of DaikinFactory and create_appliance for the entry."""
+    return {
+        "password": entry.data.get(CONF_PASSWORD),
+        "key": entry.data.get(CONF_API_KEY),
+        "uuid": entry.data.get(CONF_UUID),
+    }
+
+
+def _refused(err: Exception) -> bool:
+    """Return True if the device refused the credentials."""
+    return isinstance(err, HTTPForbidden) or (
+        isinstance(err, ClientResponseError) and err.status in (401, 403)
+    )
+
+
+async def _async_restore_appliance(hass: HomeAssistant, entry: ConfigEntry):
+    """Return the appliance of the driver of the snapshot with its values, None
+    if there is no usable snapshot. The device is not contacted."""
+    from .pydaikin.factory import create_appliance, driver_name, extract_ip_port
+    from .pydaikin.snapshot import SNAPSHOTS
+
+    host = entry.data[CONF_HOST]
+    credentials = _credentials(entry)
+    name = driver_name(SNAPSHOTS.driver(entry.entry_id))
+    # The credentials decide the driver, the snapshot of another one is stale
+    if credentials["password"] is not None:
+        expected = ("skyfi",)
+    elif credentials["key"] is not None:
+        expected = ("brp072c",)
+    else:
+        expected = ("brp280", "brp069", "airbase")
+    if name not in expected:
+        return None
+    device_ip, device_port = await extract_ip_port(host)
+    daikin_api = create_appliance(
+        name, device_ip, async_get_clientsession(hass), device_port, **credentials
+    )
+    SNAPSHOTS.restore(daikin_api, entry.entry_id)
+    return daikin_api
+
+
+async def _async_init_appliance(
+    hass: HomeAssistant, entry: ConfigEntry, daikin_api, ready: asyncio.Event
+):
+    """Initialize a restored appliance, retrying while the device does not answer,
+    and set ready once done."""
+    from .pydaikin.exceptions import DaikinException
+    from .pydaikin.snapshot import SNAPSHOTS
+
+    host = entry.data[CONF_HOST]
+    retry = SETUP_RETRY
+    while True:
+        # Bound the number of devices initialized at the same time across entries
+        async with hass.data[DOMAIN][DATA_SETUP]:
+            try:
+                await daikin_api.init()
+                break
+            except (HTTPForbidden, ClientResponseError) as err:
+                if _refused(err):
+                    _LOGGER.error("Daikin device %s refused the credentials", host)
+                    return
+                _LOGGER.warning(
+                    "Error connecting to Daikin device %s, retrying in %ss: %s",
+                    host,
+                    retry,
+                    err,
+                )
+            except (HTTPNotFound, DaikinException) as err:
+                # Another kind of adapter answers, set the entry up from a probe
+                _LOGGER.warning(
+                    "Daikin device %s does not match its snapshot, probing: %s",
+                    host,
+                    err,
+                )
+                SNAPSHOTS.discard(entry.entry_id)
+                hass.config_entries.async_schedule_reload(entry.entry_id)
+                return
+            except (ClientError, asyncio.TimeoutError, OSError) as err:
+                _LOGGER.warning(
+                    "Error connecting to Daikin device %s, retrying in %ss: %s",
+                    host,
+                    retry,
+                    err,
+                )
+        await asyncio.sleep(retry)
+        retry = min(retry * 2, SETUP_RETRY_MAX)
+    ready.set()
+
+
 async def async_unload_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
     """Unload a config entry."""
     unload_ok = all(
@@ -63,6 +254,42 @@ async def async_unload_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
     )
     
     if unload_ok:
-        hass.data[DOMAIN].pop(entry.entry_id)
+        from .pydaikin.snapshot import SNAPSHOTS
+
+        daikin_api = hass.data[DOMAIN].pop(entry.entry_id)
+        hass.data[DOMAIN][DATA_READY].pop(entry.entry_id)
+        await _async_untrack_device_ip(hass, daikin_api)
+        # The next setup starts from the values the device had when unloaded
+        SNAPSHOTS.save(daikin_api, force=True)
+        SNAPSHOTS.untrack(daikin_api)
+        await daikin_api.close()
     
-    return unload_ok
\ No newline at end of file
+    return unload_ok
+
+
+async def _async_track_device_ip(hass: HomeAssistant, daikin_api):
+    """Follow the device through IP changes with the shared discovery listener."""
+    from .pydaikin.discovery import DiscoveryService
+
+    service = hass.data[DOMAIN].get(DATA_DISCOVERY)
+    if service is None:
+        service = DiscoveryService()
+        try:
+            await service.start()
+        except OSError as err:
+            _LOGGER.debug("Discovery listener not available: %s", err)
+            return
+        hass.data[DOMAIN][DATA_DISCOVERY] = service
+
+    service.register(daikin_api)
+
+
+async def _async_untrack_device_ip(hass: HomeAssistant, daikin_api):
+    """Stop following the device, stop the listener once no device is left."""
+    service = hass.data[DOMAIN].get(DATA_DISCOVERY)
+    if service is None:
+        return
+
+    service.unregister(daikin_api)
+    if not service.tracking:
+        await hass.data[DOMAIN].pop(DATA_DISCOVERY).stop()
\ No newline at end of file
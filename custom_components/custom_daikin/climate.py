@@ -1,8 +1,11 @@
 """Support for Daikin AC units."""
+from datetime import timedelta
 import logging
+from typing import Any
 
 from homeassistant.components.climate import ClimateEntity
 from homeassistant.components.climate.const import (
+    ATTR_CURRENT_TEMPERATURE,
     ATTR_FAN_MODE,
     ATTR_HVAC_MODE,
     ATTR_PRESET_MODE,
@@ -12,15 +15,20 @@ from homeassistant.components.climate.const import (
 )
 from homeassistant.const import ATTR_TEMPERATURE, TEMP_CELSIUS
 from homeassistant.helpers.entity import DeviceInfo
+from homeassistant.helpers.restore_state import RestoreEntity
 
 from .const import (
     ATTR_INSIDE_TEMPERATURE,
     ATTR_OUTSIDE_TEMPERATURE,
+    DATA_READY,
     DOMAIN,
 )
 
 _LOGGER = logging.getLogger(__name__)
 
+# Fast lane of the appliance poll, full updates run at their own slower cadence
+SCAN_INTERVAL = timedelta(seconds=10)
+
 # Map Daikin HVAC modes to Home Assistant modes
 HVAC_MODE_MAPPING = {
     "off": HVACMode.OFF,
@@ -38,19 +46,21 @@ HVAC_MODE_REVERSE_MAPPING = {v: k for k, v in HVAC_MODE_MAPPING.items()}
 async def async_setup_entry(hass, entry, async_add_entities):
     """Set up Daikin climate based on config_entry."""
     daikin_api = hass.data[DOMAIN][entry.entry_id]
+    ready = hass.data[DOMAIN][DATA_READY][entry.entry_id]
     
-    async_add_entities([DaikinClimate(daikin_api)], update_before_add=True)
+    async_add_entities([DaikinClimate(daikin_api, ready)], update_before_add=True)
 
 
-class DaikinClimate(ClimateEntity):
+class DaikinClimate(ClimateEntity, RestoreEntity):
     """Representation of a Daikin HVAC."""
 
     _attr_temperature_unit = TEMP_CELSIUS
     _enable_turn_on_off_backwards_compatibility = False
 
-    def __init__(self, api):
+    def __init__(self, api, ready):
         """Initialize the climate device."""
         self._api = api
+        self._ready = ready
         self._attr_unique_id = f"{api.mac}-climate"
         self._attr_name = f"{api.name} Climate"
         
@@ -94,9 +104,33 @@ class DaikinClimate(ClimateEntity):
             sw_version=getattr(api, "firmware_version", None),
         )
 
+    @property
+    def available(self) -> bool:
+        """Return False until the device has been initialized and while it is
+        unreachable, its values are stale."""
+        return self._ready.is_set() and self._api.available
+
+    async def async_added_to_hass(self) -> None:
+        """Show the last known state until the device has answered."""
+        await super().async_added_to_hass()
+        if self._attr_hvac_mode is not None:
+            return
+        last_state = await self.async_get_last_state()
+        if last_state is None or last_state.state not in self._attr_hvac_modes:
+            return
+        self._attr_hvac_mode = HVACMode(last_state.state)
+        attributes = last_state.attributes
+        self._attr_current_temperature = attributes.get(ATTR_CURRENT_TEMPERATURE)
+        self._attr_target_temperature = attributes.get(ATTR_TEMPERATURE)
+        self._attr_fan_mode = attributes.get(ATTR_FAN_MODE)
+        self._attr_swing_mode = attributes.get(ATTR_SWING_MODE)
+        self._attr_preset_mode = attributes.get(ATTR_PRESET_MODE)
+
     async def async_update(self) -> None:
         """Retrieve latest state."""
-        await self._api.update_status()
+        # Before init the values are the ones of the snapshot
+        if self._ready.is_set():
+            await self._api.poll()
         
         # Update current temperature
         if hasattr(self._api, "inside_temperature"):
@@ -14,6 +14,27 @@ CONF_UUID = "uuid"
 KEY_MAC = "mac"
 TIMEOUT = 30  # seconds
 
+# Services
+SERVICE_PROFILE = "profile"
+
+# Shared objects stored in hass.data[DOMAIN]
+DATA_DISCOVERY = "discovery"
+DATA_SETUP = "setup"
+# Per entry asyncio.Event, set once the appliance has been initialized
+DATA_READY = "ready"
+
+# Version of the records kept in .storage by homeassistant.helpers.storage.Store
+STORAGE_VERSION = 1
+# Seconds to wait for more changes before writing a record
+STORAGE_SAVE_DELAY = 10
+
+# Devices probed and initialized at the same time
+SETUP_PARALLELISM = 4
+# Delay before initializing again a device which did not answer, doubled up to
+# the max, see _async_init_appliance
+SETUP_RETRY = 30  # seconds
+SETUP_RETRY_MAX = 600  # seconds
+
 # Attributes
 ATTR_INSIDE_TEMPERATURE = "inside_temperature"
 ATTR_OUTSIDE_TEMPERATURE = "outside_temperature"
@@ -29,6 +50,8 @@ ATTR_DAILY_HEAT_ENERGY = "daily_heat_energy"
 ATTR_CURRENT_TOTAL_POWER = "current_total_power"
 ATTR_CURRENT_COOL_POWER = "current_cool_power"
 ATTR_CURRENT_HEAT_POWER = "current_heat_power"
+ATTR_REQUEST_LATENCY = "request_latency"
+ATTR_REQUEST_ERRORS = "request_errors"
 
 # Sensor types
 SENSOR_TYPE_TEMPERATURE = "temperature"
@@ -0,0 +1,30 @@
+"""Capability profile of an appliance."""
+
+from dataclasses import dataclass, fields
+
+
+@dataclass(frozen=True)
+class Capabilities:  # pylint: disable=too-many-instance-attributes
+    """Features supported by an appliance, one field per support_* property."""
+
+    away_mode: bool = False
+    fan_rate: bool = False
+    swing_mode: bool = False
+    outside_temperature: bool = False
+    humidity: bool = False
+    advanced_modes: bool = False
+    compressor_frequency: bool = False
+    filter_dirty: bool = False
+    zone_count: bool = False
+    zone_temperature: bool = False
+    energy_consumption: bool = False
+
+    @classmethod
+    def of(cls, appliance) -> 'Capabilities':
+        """Evaluate the support_* properties of an appliance."""
+        return cls(
+            **{
+                field.name: bool(getattr(appliance, f'support_{field.name}', False))
+                for field in fields(cls)
+            }
+        )
@@ -0,0 +1,149 @@
+"""Wire capture of device traffic, and replay of captures without hardware."""
+
+from collections import defaultdict, deque
+import json
+import logging
+import logging.handlers
+import queue
+import time
+from typing import Optional, Tuple
+
+_LOGGER = logging.getLogger(__name__)
+
+CAPTURE_MAX_BYTES = 10 * 1024 * 1024
+CAPTURE_BACKUP_COUNT = 5
+
+# Parameters holding secrets, never written to captures and ignored on replay
+SENSITIVE_PARAMS = ('pass', 'key')
+MASK = '****'
+
+
+def _mask(params: Optional[dict]) -> dict:
+    if not params:
+        return {}
+    return {
+        k: MASK if k in SENSITIVE_PARAMS else v for k, v in params.items()
+    }
+
+
+def _request_key(method: str, path: str, params: Optional[dict]) -> Tuple[str, str, str]:
+    return method, path, json.dumps(_mask(params), sort_keys=True, default=str)
+
+
+class CaptureRecorder:
+    """Write raw request and response pairs to a rotating JSON lines capture file.
+
+    Records are serialized on the event loop but written to disk by a background
+    thread, so recording never blocks on file I/O."""
+
+    def __init__(
+        self,
+        path: str,
+        max_bytes: int = CAPTURE_MAX_BYTES,
+        backup_count: int = CAPTURE_BACKUP_COUNT,
+    ) -> None:
+        self.path = path
+        handler = logging.handlers.RotatingFileHandler(
+            path, maxBytes=max_bytes, backupCount=backup_count, encoding='utf-8'
+        )
+        handler.setFormatter(logging.Formatter('%(message)s'))
+        self._queue = queue.SimpleQueue()
+        self._listener = logging.handlers.QueueListener(self._queue, handler)
+        self._listener.start()
+
+    def record(  # pylint: disable=too-many-arguments
+        self,
+        appliance,
+        method: str,
+        path: str,
+        params: Optional[dict],
+        status: int,
+        body: str,
+    ):
+        """Record one request and its response."""
+        line = json.dumps(
+            {
+                't': time.time(),
+                'd': type(appliance).__name__,
+                'ip': appliance.device_ip,
+                'm': method,
+                'p': path,
+                'q': _mask(params),
+                's': status,
+                'b': body,
+            },
+            separators=(',', ':'),
+            default=str,
+        )
+        self._queue.put_nowait(
+            logging.LogRecord(__name__, logging.INFO, '', 0, line, None, None)
+        )
+
+    def close(self):
+        """Flush pending records and close the capture file."""
+        self._listener.stop()
+        for handler in self._listener.handlers:
+            handler.close()
+
+
+class ReplayTransport:
+    """Transport answering requests from a capture instead of a device.
+
+    Responses to the same request are replayed in their captured order, cycling
+    once exhausted. A request never seen with these parameters is answered with
+    a response captured for the same path. Set it as the `transport` of any
+    Appliance to run it against real traffic at full speed."""
+
+    def __init__(self, path: str, device: Optional[str] = None) -> None:
+        self.base_url = None
+        self._responses = defaultdict(deque)
+        self._responses_by_path = defaultdict(deque)
+        with open(path, encoding='utf-8') as file:
+            for line in file:
+                record = json.loads(line)
+                if device is not None and record['ip'] != device:
+                    continue
+                response = (record['s'], record['b'])
+                self._responses[_request_key(record['m'], record['p'], record['q'])].append(
+                    response
+                )
+                self._responses_by_path[(record['m'], record['p'])].append(response)
+        if not self._responses:
+            raise ValueError(f"No capture records in {path}")
+
+    def __len__(self) -> int:
+        return sum(len(responses) for responses in self._responses.values())
+
+    @staticmethod
+    def _next(responses: deque) -> Tuple[int, str]:
+        response = responses.popleft()
+        responses.append(response)
+        return response
+
+    def _reply(self, method: str, path: str, params: Optional[dict]) -> Tuple[int, str]:
+        responses = self._responses.get(_request_key(method, path, params))
+        if not responses:
+            responses = self._responses_by_path.get((method, path))
+        if not responses:
+            return 404, ''
+        return self._next(responses)
+
+    async def rebind(self, base_url: str):
+        """Replayed devices do not move."""
+
+    async def get(
+        self,
+        path: str,
+        params: Optional[dict] = None,
+        headers: Optional[dict] = None,
+        timeout: Optional[float] = None,
+    ) -> Tuple[int, str]:  # pylint: disable=unused-argument
+        """Replay a GET request."""
+        return self._reply('GET', path, params)
+
+    async def post(self, path: str, payload) -> Tuple[int, str]:
+        """Replay a POST request."""
+        return self._reply('POST', path, payload)
+
+    async def close(self):
+        """Nothing to close."""
@@ -0,0 +1,70 @@
+"""JSON codecs of the firmware 2.8.0 multireq traffic."""
+
+import functools
+import json
+from typing import Union
+
+
+class JsonCodec:
+    """Encode and decode with the standard library."""
+
+    name = 'json'
+
+    def dumps(self, obj) -> bytes:
+        """Return the compact UTF-8 encoding of obj."""
+        return json.dumps(obj, separators=(',', ':')).encode()
+
+    def loads(self, data: Union[bytes, str]):
+        """Decode a JSON document."""
+        return json.loads(data)
+
+
+class OrjsonCodec(JsonCodec):
+    """Encode and decode with orjson, several times faster on multireq bodies."""
+
+    name = 'orjson'
+
+    def __init__(self) -> None:
+        # pylint: disable=import-outside-toplevel
+        import orjson
+
+        self._orjson = orjson
+
+    def dumps(self, obj) -> bytes:
+        return self._orjson.dumps(obj)
+
+    def loads(self, data: Union[bytes, str]):
+        return self._orjson.loads(data)
+
+
+# In order of preference, the first one installed is the default
+CODECS = {
+    OrjsonCodec.name: OrjsonCodec,
+    JsonCodec.name: JsonCodec,
+}
+
+
+def register_codec(codec: type):
+    """Make a codec class available under its name, preferred to the others."""
+    others = {name: cls for name, cls in CODECS.items() if name != codec.name}
+    CODECS.clear()
+    CODECS.update({codec.name: codec, **others})
+    get_codec.cache_clear()
+    default_codec.cache_clear()
+
+
+@functools.lru_cache(maxsize=None)
+def get_codec(name: str) -> JsonCodec:
+    """Return the named codec, ImportError if its library is not installed."""
+    return CODECS[name]()
+
+
+@functools.lru_cache(maxsize=None)
+def default_codec() -> JsonCodec:
+    """Return the preferred codec whose library is installed."""
+    for name in CODECS:
+        try:
+            return get_codec(name)
+        except ImportError:
+            continue
+    return JsonCodec()
@@ -5,6 +5,7 @@ from typing import Optional
 from urllib.parse import quote, unquote
 
 from .daikin_brp069 import DaikinBRP069
+from .deadline import with_deadline
 from .exceptions import DaikinException
 
 _LOGGER = logging.getLogger(__name__)
@@ -45,8 +46,12 @@ class DaikinAirBase(DaikinBRP069):
 
     INFO_RESOURCES = DaikinBRP069.INFO_RESOURCES + ["aircon/get_zone_setting"]
 
+    METADATA_RESOURCES = ["aircon/get_model_info"]
+
     DEFAULTS = {"htemp": "-", "otemp": "-", "shum": "--"}
 
+    ZONE_KEYS = ("zone_name", "zone_onoff", "lztemp_c", "lztemp_h")
+
     @staticmethod
     def parse_response(response_body):
         """Parse response from Daikin, add support for f_rate-auto."""
@@ -57,11 +62,12 @@ class DaikinAirBase(DaikinBRP069):
 
         return response
 
-    def __init__(  # pylint:disable=useless-parent-delegation
+    def __init__(
         self, device_id, session=None
     ) -> None:
         """Init Daikin AirBase (BRP15B61) device."""
         super().__init__(device_id, session)
+        self._zone_table = (None, {})
 
     async def init(self):
         """Init status and set defaults."""
@@ -145,6 +151,7 @@ class DaikinAirBase(DaikinBRP069):
 
         return current_val
 
+    @with_deadline('SET_BUDGET')
     async def set(self, settings):
         """Set settings on Daikin device."""
         await self._update_settings(settings)
@@ -176,44 +183,55 @@ class DaikinAirBase(DaikinBRP069):
 
         return (k, val)
 
+    def _zones_decoded(self):
+        """Return the zone keys split into lists, decoded again only when they change."""
+        raw = tuple(self.values.get(key) for key in self.ZONE_KEYS)
+        if raw != self._zone_table[0]:
+            table = {
+                key: unquote(value).split(";")
+                for key, value in zip(self.ZONE_KEYS, raw)
+                if value is not None
+            }
+            if "zone_name" in table:
+                table["zone_name"] = [
+                    name.strip(" +,") for name in table["zone_name"]
+                ]
+            self._zone_table = (raw, table)
+        return self._zone_table[1]
+
     @property
     def zones(self):
         """Return list of zones."""
         if not self.values.get("zone_name"):
             return None
-        enabled_zones = len(self.represent("zone_name")[1])
-        if self.support_zone_count:
+        table = self._zones_decoded()
+        enabled_zones = len(table["zone_name"])
+        if self.capabilities.zone_count:
             enabled_zones = int(self.zone_count)  # float to int
-        zone_onoff = self.represent("zone_onoff")[1]
-        zone_list = self.represent("zone_name")[1][
-            :enabled_zones
-        ]  # Slicing to limit zones
-        if self.support_zone_temperature:
+        zone_onoff = table["zone_onoff"]
+        zone_list = table["zone_name"][:enabled_zones]  # Slicing to limit zones
+        if self.capabilities.zone_temperature:
             mode = self.values["mode"]
 
             if mode == "3":
                 mode = self.values["operate"]
 
             if mode == "1":
-                zone_temp = self.represent("lztemp_h")[1]
+                zone_temp = table["lztemp_h"]
             elif mode == "2":
-                zone_temp = self.represent("lztemp_c")[1]
+                zone_temp = table["lztemp_c"]
             else:
                 zone_temp = [self.values["stemp"]] * len(zone_list)
 
             return [
-                (name.strip(" +,"), zone_onoff[i], float(zone_temp[i]))
+                (name, zone_onoff[i], float(zone_temp[i]))
                 for i, name in enumerate(zone_list)
             ]
 
-        return [
-            (name.strip(" +,"), zone_onoff[i], 0) for i, name in enumerate(zone_list)
-        ]
+        return [(name, zone_onoff[i], 0) for i, name in enumerate(zone_list)]
 
-    async def set_zone(self, zone_id, key, value):
-        """Set zone status."""
-        current_state = await self._get_resource("aircon/get_zone_setting")
-        self.values.update(current_state)
+    def _zone_setting_key(self, key):
+        """Return the zone setting key, lztemp follows the current mode."""
         if key == "lztemp":
             mode = self.values["mode"]
 
@@ -224,13 +242,35 @@ class DaikinAirBase(DaikinBRP069):
                 key = "lztemp_h"
             elif mode == "2":
                 key = "lztemp_c"
+        return key
+
+    async def set_zone(self, zone_id, key, value):
+        """Set zone status."""
+        await self.set_zones([(zone_id, key, value)], confirm=False)
+
+    @with_deadline('SET_BUDGET')
+    async def set_zones(self, changes, confirm=True):
+        """Set several zones at once from a list of (zone_id, key, value).
+
+        The zone setting is read once and all changes are sent in a single
+        request, then read back to confirm unless confirm is False.
+        """
+        current_state = await self._get_resource("aircon/get_zone_setting")
+        self.values.update(current_state)
 
-        if key not in current_state:
-            raise KeyError
+        groups = {}
+        for zone_id, key, value in changes:
+            key = self._zone_setting_key(key)
+            if key not in current_state:
+                raise KeyError(key)
+            if key not in groups:
+                groups[key] = self.represent(key)[1]
+            groups[key][zone_id] = value
 
-        current_group = self.represent(key)[1]
-        current_group[zone_id] = value
-        self.values[key] = quote(";".join(current_group)).lower()
+        if not groups:
+            return
+        for key, group in groups.items():
+            self.values[key] = quote(";".join(group)).lower()
 
         path = "aircon/set_zone_setting"
         params = {
@@ -238,7 +278,7 @@ class DaikinAirBase(DaikinBRP069):
             "zone_onoff": self.values["zone_onoff"],
         }
 
-        if self.support_zone_temperature:
+        if self.capabilities.zone_temperature:
             params.update({"lztemp_c": self.values["lztemp_c"]})
             params.update({"lztemp_h": self.values["lztemp_h"]})
 
@@ -255,4 +295,17 @@ class DaikinAirBase(DaikinBRP069):
             "Updating ['aircon/set_zone_setting']: %s",
             ",".join(f"{k}={unquote(v)}" for k, v in params.items()),
         )
-        await self._get_resource(path)
\ No newline at end of file
+        await self._get_resource(path)
+
+        if not confirm:
+            return
+        confirmed = await self._get_resource("aircon/get_zone_setting")
+        self.values.update(confirmed)
+        for key, group in groups.items():
+            if unquote(confirmed.get(key, "")).split(";") != list(map(str, group)):
+                _LOGGER.warning(
+                    "Zone setting %s not applied by %s: %s",
+                    key,
+                    self.device_ip,
+                    unquote(confirmed.get(key, "")),
+                )
@@ -3,34 +3,95 @@
 import asyncio
 from collections import defaultdict
 from datetime import datetime, timedelta, timezone
+import functools
 import logging
 import socket
+import time
 from ssl import SSLContext
 from typing import Optional
 from urllib.parse import unquote
 
-from aiohttp import ClientSession
+from aiohttp import ClientSession, ClientTimeout, RequestInfo
 from aiohttp.client_exceptions import (
+    ClientError,
     ClientOSError,
     ClientResponseError,
     ServerDisconnectedError,
 )
 from aiohttp.web_exceptions import HTTPForbidden
-from tenacity import (
-    before_sleep_log,
-    retry,
-    retry_if_exception_type,
-    stop_after_attempt,
-    wait_random_exponential,
-)
-
-from .discovery import get_name
+from yarl import URL
+
+from .capabilities import Capabilities
+from .deadline import EndpointTimeouts, deadline_expired, with_deadline
+from .exceptions import DeviceUnavailable
+from .health import DeviceHealth
+from .metadata import METADATA_CACHE, normalize_mac
+from .metrics import METRICS
 from .power import ATTR_COOL, ATTR_HEAT, ATTR_TOTAL, TIME_TODAY, DaikinPowerMixin
 from .response import parse_response
+from .session import SESSION_MANAGER
+from .snapshot import SNAPSHOTS
 from .values import ApplianceValues
 
 _LOGGER = logging.getLogger(__name__)
 
+# Errors showing that the device could not be reached
+REQUEST_ERRORS = (ClientError, asyncio.TimeoutError, OSError)
+
+
+def _retry_requests(func):
+    """Retry a request on connection errors and timeouts, within the deadline.
+
+    tenacity is only imported once the first request is made."""
+    retrying = None
+
+    @functools.wraps(func)
+    async def wrapper(*args, **kwargs):
+        nonlocal retrying
+        if retrying is None:
+            # pylint: disable=import-outside-toplevel
+            from tenacity import (
+                before_sleep_log,
+                retry,
+                retry_if_exception_type,
+                stop_after_attempt,
+                stop_any,
+                wait_random_exponential,
+            )
+
+            log_retry = before_sleep_log(_LOGGER, logging.DEBUG)
+
+            def before_retry(retry_state):
+                """Log and count a request retry."""
+                log_retry(retry_state)
+                appliance = retry_state.args[0]
+                path = (
+                    retry_state.args[1]
+                    if len(retry_state.args) > 1
+                    else retry_state.kwargs['path']
+                )
+                METRICS.record_retry(
+                    appliance.device_ip, appliance.timeouts.endpoint(path)
+                )
+
+            retrying = retry(
+                reraise=True,
+                wait=wait_random_exponential(multiplier=0.2, max=1.2),
+                stop=stop_any(stop_after_attempt(3), deadline_expired),
+                retry=retry_if_exception_type(
+                    (
+                        ClientOSError,
+                        ClientResponseError,
+                        ServerDisconnectedError,
+                        asyncio.TimeoutError,
+                    )
+                ),
+                before_sleep=before_retry,
+            )(func)
+        return await retrying(*args, **kwargs)
+
+    return wrapper
+
 
 class Appliance(DaikinPowerMixin):  # pylint: disable=too-many-public-methods
     """Daikin main appliance class."""
@@ -38,6 +99,11 @@ class Appliance(DaikinPowerMixin):  # pylint: disable=too-many-public-methods
     base_url: str
     session: Optional[ClientSession]
     ssl_context: Optional[SSLContext] = None
+    # LeanTransport or ReplayTransport replacing the aiohttp session
+    transport = None
+    # CaptureRecorder writing every request and response
+    recorder = None
+    _capabilities = (None, None)
 
     TRANSLATIONS = {}
 
@@ -47,8 +113,39 @@ class Appliance(DaikinPowerMixin):  # pylint: disable=too-many-public-methods
 
     INFO_RESOURCES = []
 
+    # Static resources served from METADATA_CACHE once fetched, never the ones
+    # identifying the device (common/basic_info)
+    METADATA_RESOURCES = []
+    # MAC given by the device itself in this session, see _load_cached_metadata
+    _confirmed_mac = None
+
+    # Values whose content, and not only presence, changes the capabilities
+    CAPABILITY_VALUES = (
+        'otemp',
+        'hhum',
+        'en_filter_sign',
+        'filter_sign_info',
+        'datas',
+        'this_year',
+        'previous_year',
+    )
+
     MAX_CONCURRENT_REQUESTS = 4
 
+    # Time budgets (in seconds) of update_status and set, see with_deadline
+    UPDATE_BUDGET = 30
+    SET_BUDGET = 20
+
+    # Fast lane of poll: light resources holding the PROBE_KEYS
+    PROBE_RESOURCES = []
+    PROBE_KEYS = ('pow', 'mode', 'stemp')
+    PROBE_INTERVAL = timedelta(seconds=10)
+    # Slow lane of poll: update_status at least this often
+    FULL_REFRESH_INTERVAL = timedelta(minutes=5)
+    _last_probe = None
+    _last_full_refresh = None
+    _poll_task = None
+
     @classmethod
     def daikin_to_human(cls, dimension, value):
         """Return converted values from Daikin to Human."""
@@ -90,6 +187,10 @@ class Appliance(DaikinPowerMixin):  # pylint: disable=too-many-public-methods
 
         if device_ip is None:
             # id is a common name, try discovery
+            from .discovery import (  # pylint: disable=import-outside-toplevel
+                get_name,
+            )
+
             device_name = get_name(device_id)
             if device_name is None:
                 # try DNS
@@ -104,7 +205,6 @@ class Appliance(DaikinPowerMixin):  # pylint: disable=too-many-public-methods
     def __init__(self, device_id, session: Optional[ClientSession] = None) -> None:
         """Init the pydaikin appliance, representing one Daikin device."""
         self.values = ApplianceValues()
-        self.session = session if session is not None else ClientSession()
         self.headers: dict = {}
         self._energy_consumption_history = defaultdict(list)
         if session:
@@ -112,9 +212,38 @@ class Appliance(DaikinPowerMixin):  # pylint: disable=too-many-public-methods
         else:
             self.device_ip = self.discover_ip(device_id)
 
+        # A session passed by the caller is never closed by the appliance
+        self._owns_session = session is None
+        self.session = (
+            session
+            if session is not None
+            else SESSION_MANAGER.acquire(self.MAX_CONCURRENT_REQUESTS)
+        )
+
         self.base_url = f"http://{self.device_ip}"
 
         self.request_semaphore = asyncio.Semaphore(value=self.MAX_CONCURRENT_REQUESTS)
+        self.health = DeviceHealth(self.device_ip)
+        self.timeouts = EndpointTimeouts()
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, exc_type, exc_value, traceback):
+        await self.close()
+
+    async def close(self):
+        """Stop polling and release the shared session if the appliance acquired it."""
+        task, self._poll_task = self._poll_task, None
+        if task is not None and not task.done():
+            task.cancel()
+            # Wait for it to stop, it must not use the session once released
+            await asyncio.wait([task])
+        if self.transport is not None:
+            await self.transport.close()
+        if self._owns_session:
+            self._owns_session = False
+            await SESSION_MANAGER.release(self.session)
 
     def __getitem__(self, name):
         """Return values from self.value."""
@@ -127,88 +256,276 @@ class Appliance(DaikinPowerMixin):  # pylint: disable=too-many-public-methods
         # Re-defined in all sub-classes
         raise NotImplementedError
 
-    @retry(
-        reraise=True,
-        wait=wait_random_exponential(multiplier=0.2, max=1.2),
-        stop=stop_after_attempt(3),
-        retry=retry_if_exception_type(
-            (
-                ClientOSError,
-                ClientResponseError,
-                ServerDisconnectedError,
-            )
-        ),
-        before_sleep=before_sleep_log(_LOGGER, logging.DEBUG),
-    )
+    def update_device_ip(self, device_ip: str):
+        """Point the appliance to a new IP address, keeping scheme and port."""
+        if device_ip == self.device_ip:
+            return
+        _LOGGER.debug("Moving %s from %s to %s", self.mac, self.device_ip, device_ip)
+        self.base_url = self.base_url.replace(f"//{self.device_ip}", f"//{device_ip}", 1)
+        self.device_ip = device_ip
+        # Whoever answers at the new address has to give its MAC again
+        self._confirmed_mac = None
+
     async def _get_resource(self, path: str, params: Optional[dict] = None):
+        """Make the http request, failing fast while the device is unreachable."""
+        self.health.before_request()
+        try:
+            response = await self._fetch_resource(path, params)
+        except REQUEST_ERRORS as exc:
+            self.health.record_failure(exc)
+            raise
+        except BaseException:
+            # Neither an answer nor a network failure, e.g. cancelled
+            self.health.abort_probe()
+            raise
+        self.health.record_success()
+        return response
+
+    @_retry_requests
+    async def _fetch_resource(self, path: str, params: Optional[dict] = None):
         """Make the http request."""
         if params is None:
             params = {}
 
-        _LOGGER.debug(
-            "Calling: %s/%s %s [%s]",
-            self.base_url,
-            path,
-            params if "pass" not in params else {**params, **{"pass": "****"}},
-            self.headers,
-        )
+        if _LOGGER.isEnabledFor(logging.DEBUG):
+            _LOGGER.debug(
+                "Calling: %s/%s %s [%s]",
+                self.base_url,
+                path,
+                params if "pass" not in params else {**params, **{"pass": "****"}},
+                self.headers,
+            )
 
         # cannot manage session on outer async with or this will close the session
         # passed to pydaikin (homeassistant for instance)
         async with self.request_semaphore:
-            async with self.session.get(
-                f'{self.base_url}/{path}',
-                params=params,
-                headers=self.headers,
-                ssl=self.ssl_context,
-            ) as response:
-                if response.status == 403:
-                    raise HTTPForbidden(reason=f"HTTP 403 Forbidden for {response.url}")
-                # Airbase returns a 404 response on invalid urls but requires fallback
-                if response.status == 404:
-                    _LOGGER.debug("HTTP 404 Not Found for %s", response.url)
-                    return (
-                        {}
-                    )  # return an empty dict to indicate successful connection but bad data
-                if response.status != 200:
-                    _LOGGER.debug(
-                        "Unexpected HTTP status code %s for %s",
-                        response.status,
-                        response.url,
+            timeout = self.timeouts.request_timeout(path)
+            endpoint = self.timeouts.endpoint(path)
+            start = time.monotonic()
+            try:
+                if self.transport is not None:
+                    response, size = await self._get_resource_transport(
+                        path, params, timeout
+                    )
+                else:
+                    response, size = await self._get_resource_aiohttp(
+                        path, params, timeout
                     )
-                response.raise_for_status()
-                return self.parse_response(await response.text())
+            except Exception as exc:
+                if isinstance(exc, asyncio.TimeoutError):
+                    self.timeouts.timed_out(path, timeout)
+                METRICS.record(
+                    self.device_ip, endpoint, time.monotonic() - start, error=exc
+                )
+                raise
+            latency = time.monotonic() - start
+            self.timeouts.observe(path, latency)
+            METRICS.record(self.device_ip, endpoint, latency, size)
+            return response
+
+    async def _get_resource_aiohttp(self, path: str, params: dict, timeout: float):
+        """Make the http request with the aiohttp session."""
+        async with self.session.get(
+            f'{self.base_url}/{path}',
+            params=params,
+            headers=self.headers,
+            ssl=self.ssl_context,
+            timeout=ClientTimeout(total=timeout),
+        ) as response:
+            if self.recorder is not None:
+                self.recorder.record(
+                    self, 'GET', path, params, response.status, await response.text()
+                )
+            if response.status == 403:
+                raise HTTPForbidden(reason=f"HTTP 403 Forbidden for {response.url}")
+            # Airbase returns a 404 response on invalid urls but requires fallback
+            if response.status == 404:
+                _LOGGER.debug("HTTP 404 Not Found for %s", response.url)
+                # return an empty dict to indicate successful connection but bad data
+                return {}, 0
+            if response.status != 200:
+                _LOGGER.debug(
+                    "Unexpected HTTP status code %s for %s",
+                    response.status,
+                    response.url,
+                )
+            response.raise_for_status()
+            size = len(await response.read())
+            return self.parse_response(await response.text()), size
+
+    async def _get_resource_transport(self, path: str, params: dict, timeout: float):
+        """Make the http request with the lightweight or replay transport."""
+        # The device may have moved since the last request
+        await self.transport.rebind(self.base_url)
+
+        status, body = await self.transport.get(
+            path, params, self.headers, timeout=timeout
+        )
+        if self.recorder is not None:
+            self.recorder.record(self, 'GET', path, params, status, body)
+        url = f'{self.base_url}/{path}'
+        if status == 403:
+            raise HTTPForbidden(reason=f"HTTP 403 Forbidden for {url}")
+        # Airbase returns a 404 response on invalid urls but requires fallback
+        if status == 404:
+            _LOGGER.debug("HTTP 404 Not Found for %s", url)
+            return {}, 0
+        # Redirects and empty responses carry no values either
+        if status != 200:
+            _LOGGER.debug("Unexpected HTTP status code %s for %s", status, url)
+            raise ClientResponseError(
+                RequestInfo(URL(url), "GET", {}), (), status=status
+            )
+        return self.parse_response(body), len(body)
 
+    @with_deadline('UPDATE_BUDGET')
     async def update_status(self, resources=None):
         """Update status from resources."""
+        if not self.health.available:
+            # Serve the last known values until the device can be probed again
+            _LOGGER.debug("Skipping update of unreachable %s", self.device_ip)
+            return
         if resources is None:
             resources = self.get_info_resources()
         resources = [
             resource
-            for resource in resources
+            for resource in self._load_cached_metadata(resources)
             if self.values.should_resource_be_updated(resource)
         ]
         _LOGGER.debug("Updating %s", resources)
 
-        try:
-            async with asyncio.TaskGroup() as tg:
-                tasks = [
-                    tg.create_task(self._get_resource(resource))
-                    for resource in resources
-                ]
-        except ExceptionGroup as eg:
-            for exc in eg.exceptions:
-                _LOGGER.error("Exception in TaskGroup: %s", exc)
-
-        for resource, task in zip(resources, tasks):
-            self.values.update_by_resource(resource, task.result())
+        # A failing resource must not cancel the others, keep whatever was fetched
+        results = await asyncio.gather(
+            *(self._get_resource(resource) for resource in resources),
+            return_exceptions=True,
+        )
+        errors = []
+        for resource, result in zip(resources, results):
+            if isinstance(result, DeviceUnavailable):
+                # Another request is probing the device, fetched on the next update
+                continue
+            if isinstance(result, BaseException):
+                _LOGGER.error("Exception updating %s: %s", resource, result)
+                errors.append(result)
+                continue
+            self.values.update_by_resource(resource, result)
+            if result.get('mac'):
+                self._confirmed_mac = normalize_mac(result['mac'])
+        for resource, result in zip(resources, results):
+            if resource in self.METADATA_RESOURCES and isinstance(result, dict):
+                self._store_metadata(resource, result)
 
         self._register_energy_consumption_history()
+        SNAPSHOTS.save(self)
+        if errors:
+            raise errors[0]
+
+    async def poll(self) -> bool:
+        """Cheap periodic update, return True if a full update ran.
+
+        The fast lane only fetches the PROBE_RESOURCES and compares the PROBE_KEYS
+        with the known values, the slow lane runs update_status when they differ
+        or every FULL_REFRESH_INTERVAL. Calls made while a poll runs, e.g. from
+        several entities of the same device, share its result, calls closer than
+        PROBE_INTERVAL after it do nothing."""
+        if self._poll_task is None:
+            now = datetime.now(timezone.utc)
+            if (
+                self._last_probe is not None
+                and now - self._last_probe < self.PROBE_INTERVAL
+            ):
+                return False
+            self._last_probe = now
+            self._poll_task = asyncio.create_task(self._poll(now))
+            self._poll_task.add_done_callback(self._poll_done)
+        # A cancelled caller must not cancel the poll the others wait for
+        return await asyncio.shield(self._poll_task)
+
+    def _poll_done(self, task: asyncio.Task):
+        if self._poll_task is task:
+            self._poll_task = None
+        if not task.cancelled():
+            # Raised to the callers, not worth a warning if they all left
+            task.exception()
+
+    async def _poll(self, now: datetime) -> bool:
+        if not self.health.available:
+            return False
+
+        if (
+            self.PROBE_RESOURCES
+            and self._last_full_refresh is not None
+            and now - self._last_full_refresh < self.FULL_REFRESH_INTERVAL
+        ):
+            known = {
+                key: self.values.get(key, invalidate=False) for key in self.PROBE_KEYS
+            }
+            if await self._probe() == known:
+                return False
+            _LOGGER.debug("State of %s changed, refreshing", self.device_ip)
+
+        await self.update_status()
+        self._last_full_refresh = now
+        return True
+
+    async def _probe(self) -> dict:
+        """Fetch the PROBE_RESOURCES, return the PROBE_KEYS they hold."""
+        for resource in self.PROBE_RESOURCES:
+            self.values.update_by_resource(resource, await self._get_resource(resource))
+        return {key: self.values.get(key, invalidate=False) for key in self.PROBE_KEYS}
 
     def get_info_resources(self):
         """Returns info_resources"""
         return self.INFO_RESOURCES
 
+    async def confirm_mac(self, resource: str = 'common/basic_info'):
+        """Fetch the resource holding the MAC of the device, even if its values are
+        fresh, e.g. restored from a snapshot, see _load_cached_metadata."""
+        data = await self._get_resource(resource)
+        self.values.update_by_resource(resource, data)
+        if data.get('mac'):
+            self._confirmed_mac = normalize_mac(data['mac'])
+
+    def _load_cached_metadata(self, resources):
+        """Fill values from METADATA_CACHE, return the resources still to fetch.
+
+        Nothing is served until the device has given its MAC in this session, the
+        cache never decides which device answers at an address."""
+        if not self.METADATA_RESOURCES or self._confirmed_mac is None:
+            return resources
+        remaining = []
+        for resource in resources:
+            data = None
+            if resource in self.METADATA_RESOURCES:
+                data = METADATA_CACHE.get(
+                    type(self).__name__, self._confirmed_mac, resource
+                )
+            if data is None:
+                remaining.append(resource)
+            else:
+                self.values.update_by_resource(resource, data)
+        return remaining
+
+    def _store_metadata(self, resource, data):
+        """Keep a static resource in METADATA_CACHE, once the device gave its MAC."""
+        if self._confirmed_mac is not None:
+            METADATA_CACHE.put(
+                type(self).__name__,
+                self._confirmed_mac,
+                resource,
+                data,
+                ip=self.device_ip,
+            )
+
+    async def refresh_metadata(self):
+        """Fetch the static metadata resources again, bypassing METADATA_CACHE."""
+        if self._confirmed_mac is not None:
+            METADATA_CACHE.refresh(self._confirmed_mac)
+        for resource in self.METADATA_RESOURCES:
+            data = await self._get_resource(resource)
+            self.values.update_by_resource(resource, data)
+            self._store_metadata(resource, data)
+
     def show_values(self, only_summary=False):
         """Print values."""
         if only_summary:
@@ -221,19 +538,17 @@ class Appliance(DaikinPowerMixin):  # pylint: disable=too-many-public-methods
                 (k, val) = self.represent(key)
                 print(f"{k : >20}: {val}")
 
-    def log_sensors(self, file):
-        """Log sensors to a file."""
-        data = [
-            ('datetime', datetime.now(timezone.utc).strftime('%Y-%m-%d %H:%M:%S')),
-            ('in_temp', self.inside_temperature),
-        ]
-        if self.support_outside_temperature:
+    def sensor_sample(self) -> list:
+        """Return the (name, value) of the sensors the device supports."""
+        capabilities = self.capabilities
+        data = [('in_temp', self.inside_temperature)]
+        if capabilities.outside_temperature:
             data.append(('out_temp', self.outside_temperature))
-        if self.support_compressor_frequency:
+        if capabilities.compressor_frequency:
             data.append(('cmp_freq', self.compressor_frequency))
-        if self.support_filter_dirty:
+        if capabilities.filter_dirty:
             data.append(('en_filter_sign', self.filter_dirty))
-        if self.support_energy_consumption:
+        if capabilities.energy_consumption:
             data.append(
                 ('total_today', self.energy_consumption(ATTR_TOTAL, TIME_TODAY))
             )
@@ -242,6 +557,16 @@ class Appliance(DaikinPowerMixin):  # pylint: disable=too-many-public-methods
             data.append(('total_power', self.current_total_power_consumption))
             data.append(('cool_energy', self.last_hour_cool_energy_consumption))
             data.append(('heat_energy', self.last_hour_heat_energy_consumption))
+        return data
+
+    def log_sensors(self, file):
+        """Log sensors to a file.
+
+        This writes and flushes synchronously, use a TimeSeriesWriter to log
+        many devices from the event loop."""
+        data = [
+            ('datetime', datetime.now(timezone.utc).strftime('%Y-%m-%d %H:%M:%S')),
+        ] + self.sensor_sample()
         if file.tell() == 0:
             file.write(','.join(k for k, _ in data))
             file.write('\n')
@@ -255,13 +580,13 @@ class Appliance(DaikinPowerMixin):  # pylint: disable=too-many-public-methods
             datetime.now(timezone.utc).strftime('%Y-%m-%d %H:%M:%S'),
             f'in_temp={int(self.inside_temperature)}°C',
         ]
-        if self.support_outside_temperature:
+        if self.capabilities.outside_temperature:
             data.append(f'out_temp={int(self.outside_temperature)}°C')
-        if self.support_compressor_frequency:
+        if self.capabilities.compressor_frequency:
             data.append(f'cmp_freq={int(self.compressor_frequency)}Hz')
-        if self.support_filter_dirty:
+        if self.capabilities.filter_dirty:
             data.append(f'en_filter_sign={int(self.filter_dirty)}')
-        if self.support_energy_consumption:
+        if self.capabilities.energy_consumption:
             data.append(
                 f'total_today={self.energy_consumption(ATTR_TOTAL, TIME_TODAY):.01f}kWh'
             )
@@ -301,11 +626,38 @@ class Appliance(DaikinPowerMixin):  # pylint: disable=too-many-public-methods
         except (TypeError, ValueError):
             return None
 
+    @property
+    def available(self) -> bool:
+        """Return True unless the device is known to be unreachable."""
+        return self.health.reachable
+
+    @property
+    def last_update(self) -> Optional[datetime]:
+        """Return when the device last answered, values are as old as this."""
+        return self.health.last_success
+
+    @property
+    def values_staleness(self) -> Optional[timedelta]:
+        """Return the age of the values, None if the device never answered."""
+        return self.health.staleness
+
     @property
     def mac(self) -> str:
         """Return device's MAC address."""
         return self.values.get('mac', self.device_ip)
 
+    @property
+    def capabilities(self) -> Capabilities:
+        """Return the capability profile, evaluated again only when the keys of
+        the values or one of CAPABILITY_VALUES change."""
+        signature = (self.values.keys_version,) + tuple(
+            self.values.get(key, invalidate=False) for key in self.CAPABILITY_VALUES
+        )
+        if signature != self._capabilities[0]:
+            with self.values.untracked():
+                self._capabilities = (signature, Capabilities.of(self))
+        return self._capabilities[1]
+
     @property
     def support_away_mode(self) -> bool:
         """Return True if the device support away_mode."""
@@ -492,4 +844,9 @@ class Appliance(DaikinPowerMixin):  # pylint: disable=too-many-public-methods
 
     async def set_zone(self, zone_id, key, value):
         """Set zone status."""
-        raise NotImplementedError
\ No newline at end of file
+        raise NotImplementedError
+
+    async def set_zones(self, changes):
+        """Set several zones from a list of (zone_id, key, value)."""
+        for zone_id, key, value in changes:
+            await self.set_zone(zone_id, key, value)
\ No newline at end of file
@@ -1,9 +1,12 @@
 """Pydaikin appliance, represent a Daikin BRP069 device."""
 
+import asyncio
 from datetime import datetime, timezone
 import logging
 
 from .daikin_base import Appliance
+from .deadline import with_deadline
+from .transport import LeanTransport
 
 _LOGGER = logging.getLogger(__name__)
 
@@ -85,6 +88,23 @@ class DaikinBRP069(Appliance):
         'aircon/get_control_info',
     ]
 
+    METADATA_RESOURCES = [
+        'common/get_remote_method',
+        'aircon/get_model_info',
+    ]
+
+    # Power, mode and setpoint, without the sensors
+    PROBE_RESOURCES = ['aircon/get_control_info']
+
+    # Not needed to build entities, loaded in the background after init
+    DEFERRED_RESOURCES = [
+        'aircon/get_price',
+        'common/get_holiday',
+        'common/get_notify',
+        'aircon/get_year_power',
+        'common/get_datetime',
+    ]
+
     VALUES_SUMMARY = [
         'name',
         'ip',
@@ -120,6 +140,8 @@ class DaikinBRP069(Appliance):
 
     MAX_CONCURRENT_REQUESTS = 1
 
+    _deferred_task = None
+
     @staticmethod
     def parse_response(response_body):
         """Parse response from Daikin
@@ -140,17 +162,64 @@ class DaikinBRP069(Appliance):
 
         return response
 
+    def use_lean_transport(self, enable: bool = True):
+        """Send GET requests over a persistent lightweight connection instead of aiohttp.
+
+        Only plain http adapters are supported."""
+        self.transport = LeanTransport(self.base_url) if enable else None
+
     async def init(self):
-        """Init status."""
-        await self.auto_set_clock()
-        if self.values:
-            await self.update_status(self.HTTP_RESOURCES[1:])
-        else:
-            await self.update_status(self.HTTP_RESOURCES)
+        """Init status.
+
+        Only the resources needed to build entities are fetched, the
+        DEFERRED_RESOURCES are loaded in the background (see load_deferred)."""
+        resources = [
+            resource
+            for resource in self.HTTP_RESOURCES
+            if resource not in self.DEFERRED_RESOURCES
+        ]
+        if self._confirmed_mac is None:
+            # Before the rest, so that their cached metadata can be served
+            await self.confirm_mac(resources[0])
+        await self.update_status(resources[1:])
+        if self._deferred_task is None:
+            self._deferred_task = asyncio.create_task(self._load_deferred())
+
+    async def load_deferred(self):
+        """Wait until the resources deferred by init are loaded."""
+        if self._deferred_task is None:
+            self._deferred_task = asyncio.create_task(self._load_deferred())
+        await asyncio.shield(self._deferred_task)
+
+    async def _load_deferred(self):
+        """Set the clock and fetch the resources skipped by init."""
+        resources = [
+            resource
+            for resource in self.DEFERRED_RESOURCES
+            if resource in self.HTTP_RESOURCES
+        ]
+        try:
+            await self.auto_set_clock()
+            await self.update_status(resources)
+        except Exception as exc:  # pylint: disable=broad-except
+            _LOGGER.warning(
+                'Raised "%s" while loading deferred resources of %s',
+                exc,
+                self.device_ip,
+            )
+
+    async def close(self):
+        """Stop loading deferred resources and release the session."""
+        task, self._deferred_task = self._deferred_task, None
+        if task is not None and not task.done():
+            task.cancel()
+            # Wait for it to stop, it must not use the session once released
+            await asyncio.wait([task])
+        await super().close()
 
     def get_info_resources(self):
         """Returns info_resources"""
-        if self.support_energy_consumption:
+        if self.capabilities.energy_consumption:
             return self.INFO_RESOURCES + [
                 'aircon/get_day_power_ex',
                 'aircon/get_week_power',
@@ -190,6 +259,7 @@ class DaikinBRP069(Appliance):
 
         return current_val
 
+    @with_deadline('SET_BUDGET')
     async def set(self, settings):
         """Set settings on Daikin device."""
         await self._update_settings(settings)
@@ -203,9 +273,9 @@ class DaikinBRP069(Appliance):
         }
 
         # Apparently some remote controllers doesn't support f_rate and f_dir
-        if self.support_fan_rate:
+        if self.capabilities.fan_rate:
             params.update({"f_rate": self.values['f_rate']})
-        if self.support_swing_mode:
+        if self.capabilities.swing_mode:
             if 'f_dir_lr' in self.values and 'f_dir_ud' in self.values:
                 # Australian Alira X uses 2 separate parameters instead of the combined f_dir
                 f_dir_ud = 'S' if self.values['f_dir'] in ('1', '3') else '0'
@@ -1,14 +1,36 @@
 """Pydaikin appliance, represent a Daikin device."""
 
+from functools import lru_cache
 import logging
 import ssl
 from uuid import NAMESPACE_OID, uuid3
 
+from aiohttp.web_exceptions import HTTPForbidden
+
 from .daikin_brp069 import DaikinBRP069
+from .metadata import METADATA_CACHE, normalize_mac
+from .registration import REGISTRATIONS
 
 _LOGGER = logging.getLogger(__name__)
 
 
+def _configure_ssl_context(context: ssl.SSLContext) -> ssl.SSLContext:
+    # SSL_OP_LEGACY_SERVER_CONNECT, https://github.com/python/cpython/issues/89051
+    context.options |= 0x4
+    context.check_hostname = False
+    context.verify_mode = ssl.CERT_NONE
+    return context
+
+
+@lru_cache(maxsize=None)
+def shared_ssl_context() -> ssl.SSLContext:
+    """Return the SSL context shared by every BRP072C appliance.
+
+    The adapters' certificates are not verified, so the CA store is never loaded
+    and the context is built once instead of once per appliance."""
+    return _configure_ssl_context(ssl.SSLContext(ssl.PROTOCOL_TLS_CLIENT))
+
+
 class DaikinBRP072C(DaikinBRP069):
     """Daikin class for BRP072Cxx units."""
 
@@ -30,17 +52,39 @@ class DaikinBRP072C(DaikinBRP069):
         self._uuid = str(uuid).replace('-', '')
         self.headers = {"X-Daikin-uuid": self._uuid}
         self.ssl_context = (
-            ssl_context
+            _configure_ssl_context(ssl_context)
             if ssl_context
-            else ssl.create_default_context(ssl.Purpose.SERVER_AUTH)
+            else shared_ssl_context()
         )
-        # SSL_OP_LEGACY_SERVER_CONNECT, https://github.com/python/cpython/issues/89051
-        self.ssl_context.options |= 0x4
-        self.ssl_context.check_hostname = False
-        self.ssl_context.verify_mode = ssl.CERT_NONE
         self.base_url = f"https://{self.device_ip}"
 
-    async def init(self):
-        """Init status."""
+    @property
+    def _registration_id(self) -> str:
+        """Return what identifies the device in REGISTRATIONS."""
+        mac = self.values.get('mac', invalidate=False) or METADATA_CACHE.mac_for(
+            self.device_ip
+        )
+        return normalize_mac(mac) if mac else self.device_ip
+
+    async def register(self):
+        """Register the uuid as a terminal of the device."""
         await self._get_resource('common/register_terminal', {"key": self._key})
-        await super().init()
\ No newline at end of file
+        REGISTRATIONS.add(self._uuid, self._registration_id)
+
+    async def init(self):
+        """Init status, registering the uuid unless it was already done."""
+        if not REGISTRATIONS.is_registered(self._uuid, self._registration_id):
+            await self.register()
+            await super().init()
+        else:
+            try:
+                await super().init()
+            except HTTPForbidden:
+                # The device forgot the terminal, e.g. after a reset
+                _LOGGER.debug("Registering %s again on %s", self._uuid, self.device_ip)
+                REGISTRATIONS.discard(self._uuid, self._registration_id)
+                await self.register()
+                await super().init()
+        # Registered before the MAC was known, record it by MAC as well
+        if not REGISTRATIONS.is_registered(self._uuid, self._registration_id):
+            REGISTRATIONS.add(self._uuid, self._registration_id)
@@ -1,14 +1,20 @@
 """Pydaikin appliance, represent a Daikin BRP device with firmware 2.8.0."""
+import asyncio
 import logging
-import json
+import time
 from dataclasses import dataclass, field
 from typing import Optional, Dict, List, Any, Tuple
 from urllib.parse import quote
 
-from aiohttp import ClientSession
+from aiohttp import ClientSession, ClientTimeout
 
+from .codec import default_codec
 from .daikin_base import Appliance
+from .deadline import with_deadline
 from .exceptions import DaikinException
+from .metadata import normalize_mac
+from .metrics import METRICS
+from .snapshot import SNAPSHOTS
 
 _LOGGER = logging.getLogger(__name__)
 
@@ -156,13 +162,25 @@ class DaikinBRP280(Appliance):
     REVERSE_FAN_MODE_MAP = {v: k for k, v in FAN_MODE_MAP.items()}
 
     INFO_RESOURCES = []
+
+    # Sent together in one multireq by _probe
+    PROBE_RESOURCES = ["/dsiot/edge/adr_0100.dgc_status?filter=pv,pt,md"]
+
+    ENDPOINT = "dsiot/multireq"
+    # JsonCodec of the multireq bodies, None for the fastest installed one
+    codec = None
     
     def __init__(
         self, device_id, session: Optional[ClientSession] = None
     ) -> None:
         """Initialize the Daikin appliance for firmware 2.8.0."""
         super().__init__(device_id, session)
-        self.url = f"{self.base_url}/dsiot/multireq"
+        self.url = f"{self.base_url}/{self.ENDPOINT}"
+
+    def update_device_ip(self, device_ip: str):
+        """Point the appliance to a new IP address."""
+        super().update_device_ip(device_ip)
+        self.url = f"{self.base_url}/{self.ENDPOINT}"
     
     @staticmethod
     def hex_to_temp(value: str, divisor=2) -> float:
@@ -237,16 +255,74 @@ class DaikinBRP280(Appliance):
         """Initialize the device and fetch initial state."""
         await self.update_status()
 
+    async def refresh_metadata(self):
+        """Ask for the adapter info again."""
+        self._confirmed_mac = None
+        await self.update_status()
+
+    def _parse_state(self, response) -> dict:
+        """Extract the power state, mode and target temperature."""
+        is_off = self.find_value_by_pn(
+            response,
+            "/dsiot/edge/adr_0100.dgc_status",
+            "dgc_status",
+            "e_1002",
+            "e_A002",
+            "p_01"
+        ) == "00"
+        mode_value = self.find_value_by_pn(
+            response,
+            '/dsiot/edge/adr_0100.dgc_status',
+            'dgc_status',
+            'e_1002',
+            'e_3001',
+            'p_01'
+        )
+        mode = 'off' if is_off else self.MODE_MAP[mode_value]
+
+        stemp = "--"
+        if mode in self.HVAC_MODE_TO_TEMP_HEX:
+            stemp = str(self.hex_to_temp(
+                self.find_value_by_pn(
+                    response,
+                    '/dsiot/edge/adr_0100.dgc_status',
+                    'dgc_status',
+                    'e_1002',
+                    'e_3001',
+                    self.HVAC_MODE_TO_TEMP_HEX[mode]
+                )
+            ))
+        return {'pow': "0" if is_off else "1", 'mode': mode, 'stemp': stemp}
+
+    async def _probe(self) -> dict:
+        """Fetch only the indoor unit status, return its power, mode and setpoint."""
+        payload = {
+            "requests": [{"op": 2, "to": to} for to in self.PROBE_RESOURCES]
+        }
+        response = await self._get_resource("", params=payload)
+        if not response or 'responses' not in response:
+            raise DaikinException("Invalid response from device")
+        return self._parse_state(response)
+
+    @with_deadline('UPDATE_BUDGET')
     async def update_status(self, resources=None):
         """Update device status."""
+        if not self.health.available:
+            # Serve the last known values until the device can be probed again
+            _LOGGER.debug("Skipping update of unreachable %s", self.device_ip)
+            return
+
         payload = {
             "requests": [
                 {"op": 2, "to": "/dsiot/edge/adr_0100.dgc_status?filter=pv,pt,md"},
                 {"op": 2, "to": "/dsiot/edge/adr_0200.dgc_status?filter=pv,pt,md"},
                 {"op": 2, "to": "/dsiot/edge/adr_0100.i_power.week_power?filter=pv,pt,md"},
-                {"op": 2, "to": "/dsiot/edge.adp_i"}
             ]
         }
+        # The adapter info is static, only ask for it until the device gave its
+        # MAC in this session
+        if self._confirmed_mac is None:
+            payload["requests"].append({"op": 2, "to": "/dsiot/edge.adp_i"})
         
         try:
             response = await self._get_resource("", params=payload)
@@ -260,31 +336,15 @@ class DaikinBRP280(Appliance):
         # Extract basic info
         try:
             # Get MAC address
-            mac = self.find_value_by_pn(response, "/dsiot/edge.adp_i", "adp_i", "mac")
-            self.values['mac'] = mac
-            
-            # Get power state
-            is_off = self.find_value_by_pn(
-                response, 
-                "/dsiot/edge/adr_0100.dgc_status", 
-                "dgc_status", 
-                "e_1002", 
-                "e_A002", 
-                "p_01"
-            ) == "00"
-            
-            # Get mode
-            mode_value = self.find_value_by_pn(
-                response, 
-                '/dsiot/edge/adr_0100.dgc_status', 
-                'dgc_status', 
-                'e_1002', 
-                'e_3001', 
-                'p_01'
-            )
+            if self._confirmed_mac is None:
+                mac = self.find_value_by_pn(
+                    response, "/dsiot/edge.adp_i", "adp_i", "mac"
+                )
+                self.values['mac'] = mac
+                self._confirmed_mac = normalize_mac(mac)
             
-            self.values['pow'] = "0" if is_off else "1"
-            self.values['mode'] = 'off' if is_off else self.MODE_MAP[mode_value]
+            # Get power state, mode and target temperature
+            self.values.update(self._parse_state(response))
             
             # Get temperatures
             self.values['otemp'] = str(self.hex_to_temp(
@@ -326,22 +386,6 @@ class DaikinBRP280(Appliance):
             except DaikinException:
                 self.values['hhum'] = "--"
             
-            # Get target temperature
-            if self.values['mode'] in self.HVAC_MODE_TO_TEMP_HEX:
-                temp_param = self.HVAC_MODE_TO_TEMP_HEX[self.values['mode']]
-                self.values['stemp'] = str(self.hex_to_temp(
-                    self.find_value_by_pn(
-                        response, 
-                        '/dsiot/edge/adr_0100.dgc_status', 
-                        'dgc_status', 
-                        'e_1002', 
-                        'e_3001', 
-                        temp_param
-                    )
-                ))
-            else:
-                self.values['stemp'] = "--"
-            
             # Get fan mode
             if self.values['mode'] in self.HVAC_MODE_TO_FAN_SPEED_ATTR_NAME:
                 fan_param = self.HVAC_MODE_TO_FAN_SPEED_ATTR_NAME[self.values['mode']]
@@ -383,28 +427,59 @@ class DaikinBRP280(Appliance):
         except DaikinException as e:
             _LOGGER.error(f"Error extracting values: {e}")
             raise
+
+        SNAPSHOTS.save(self)
             
-    async def _get_resource(self, path: str, params: Optional[Dict] = None):
+    async def _fetch_resource(self, path: str, params: Optional[Dict] = None):
         """Make the HTTP request to the device."""
-        _LOGGER.debug(
-            "Calling: %s %s",
-            self.url,
-            json.dumps(params) if params else "{}",
-        )
+        codec = self.codec or default_codec()
+        # Encoded once, for the request and the debug log
+        body = codec.dumps(params or {})
+        if _LOGGER.isEnabledFor(logging.DEBUG):
+            _LOGGER.debug("Calling: %s %s", self.url, body.decode())
 
+        timeout = None
         try:
             async with self.request_semaphore:
-                async with self.session.post(
-                    self.url,
-                    json=params,
-                    headers=self.headers,
-                    ssl=self.ssl_context,
-                    timeout=5  # Add a timeout to avoid hanging
-                ) as response:
-                    response.raise_for_status()
-                    return await response.json()
+                timeout = self.timeouts.request_timeout(self.url)
+                start = time.monotonic()
+                if self.transport is not None:
+                    status, raw = await self.transport.post(self.ENDPOINT, params)
+                    if status >= 400:
+                        raise DaikinException(f"HTTP {status} from {self.url}")
+                    size, data = len(raw), codec.loads(raw)
+                else:
+                    async with self.session.post(
+                        self.url,
+                        data=body,
+                        headers={**self.headers, 'Content-Type': 'application/json'},
+                        ssl=self.ssl_context,
+                        timeout=ClientTimeout(total=timeout),
+                    ) as response:
+                        raw = await response.read()
+                        if self.recorder is not None:
+                            self.recorder.record(
+                                self,
+                                'POST',
+                                self.ENDPOINT,
+                                params,
+                                response.status,
+                                raw.decode('utf-8', 'replace'),
+                            )
+                        response.raise_for_status()
+                        size, data = len(raw), codec.loads(raw)
+                latency = time.monotonic() - start
+                self.timeouts.observe(self.url, latency)
+                METRICS.record(self.device_ip, self.ENDPOINT, latency, size)
+                return data
         except Exception as e:
-            _LOGGER.debug(f"Error in _get_resource: {e}")
+            _LOGGER.debug(f"Error in _fetch_resource: {e}")
+            if timeout is not None:
+                if isinstance(e, asyncio.TimeoutError):
+                    self.timeouts.timed_out(self.url, timeout)
+                METRICS.record(
+                    self.device_ip, self.ENDPOINT, time.monotonic() - start, error=e
+                )
             raise
                 
     async def _update_settings(self, settings):
@@ -424,6 +499,7 @@ class DaikinBRP280(Appliance):
                 
         return self.values
                 
+    @with_deadline('SET_BUDGET')
     async def set(self, settings):
         """Set settings on Daikin device."""
         await self._update_settings(settings)
@@ -1,12 +1,13 @@
 """Pydaikin appliance, represent a Daikin device."""
 
-from asyncio import sleep
 import logging
 from urllib.parse import unquote
 
 from aiohttp import ClientSession
 
-from .daikin_base import Appliance
+from .daikin_base import REQUEST_ERRORS, Appliance
+from .deadline import with_deadline
+from .pacing import AdaptivePacer
 
 _LOGGER = logging.getLogger(__name__)
 
@@ -18,6 +19,8 @@ class DaikinSkyFi(Appliance):
 
     INFO_RESOURCES = HTTP_RESOURCES
 
+    PROBE_RESOURCES = ['ac.cgi']
+
     SKYFI_TO_DAIKIN = {
         'outsidetemp': 'otemp',
         'roomtemp': 'htemp',
@@ -52,6 +55,8 @@ class DaikinSkyFi(Appliance):
 
     MAX_CONCURRENT_REQUESTS = 1
 
+    ZONE_KEYS = ('nz', 'zone') + tuple(f'zone{i}' for i in range(1, 9))
+
     def __init__(
         self,
         device_id: str,
@@ -62,6 +67,9 @@ class DaikinSkyFi(Appliance):
         super().__init__(device_id, session)
         self.base_url = f"http://{self.device_ip}:2000"
         self._password = password
+        # SkyFi controllers need a gap between back-to-back requests
+        self.pacer = AdaptivePacer(self.device_ip, errors=REQUEST_ERRORS)
+        self._zone_table = (None, [])
 
     def __getitem__(self, name):
         """Return named value."""
@@ -117,9 +125,10 @@ class DaikinSkyFi(Appliance):
             params = {}
         # ensure password is the first parameter
         params = {**{"pass": self._password}, **params}
-        ret = await super()._get_resource(path, params)
-        await sleep(0.3)
-        return ret
+        if self.pacer is None:
+            return await super()._get_resource(path, params)
+        async with self.pacer:
+            return await super()._get_resource(path, params)
 
     def represent(self, key):
         """Return translated value from key."""
@@ -131,6 +140,7 @@ class DaikinSkyFi(Appliance):
             val = str(bin(int(self[key]) + 256))[3 : int(self['nz']) + 3]
         return (k, val)
 
+    @with_deadline('SET_BUDGET')
     async def set(self, settings):
         """Set settings on Daikin device."""
         _LOGGER.debug("Updating settings: %s", settings)
@@ -168,25 +178,50 @@ class DaikinSkyFi(Appliance):
         """Return list of zones."""
         if 'nz' not in self.values:
             return False  # pragma: no cover
-        return [
-            v
-            for i, v in enumerate(
-                [
-                    (self.represent(f'zone{i + 1}')[1].strip(' +,'), onoff)
-                    for i, onoff in enumerate(self.represent('zone')[1])
-                ]
-            )
-            if v != f'Zone {i + 1}'
-        ]
+        raw = tuple(self.values.get(key) for key in self.ZONE_KEYS)
+        if raw != self._zone_table[0]:
+            # Decode once per change of the zone keys, shared by all readers
+            zones = [
+                v
+                for i, v in enumerate(
+                    [
+                        (self.represent(f'zone{i + 1}')[1].strip(' +,'), onoff)
+                        for i, onoff in enumerate(self.represent('zone')[1])
+                    ]
+                )
+                if v != f'Zone {i + 1}'
+            ]
+            self._zone_table = (raw, zones)
+        return list(self._zone_table[1])
 
     async def set_zone(self, zone_id, key, value):
         """Set zone status."""
-        if key != 'zone_onoff':
-            return
-        zone_id += 1
-
-        params = {
-            "z": zone_id,
-            "s": value,
+        await self.set_zones([(zone_id, key, value)])
+
+    @with_deadline('SET_BUDGET')
+    async def set_zones(self, changes):
+        """Set several zones from a list of (zone_id, key, value).
+
+        The controller takes one zone per request, so only the last change of
+        each zone is sent and the zone mask of the replies confirms the result.
+        """
+        wanted = {
+            zone_id: str(value)
+            for zone_id, key, value in changes
+            if key == 'zone_onoff'
         }
-        self.values.update(await self._get_resource("setzone.cgi", params))
\ No newline at end of file
+        for zone_id, value in wanted.items():
+            params = {
+                "z": zone_id + 1,
+                "s": value,
+            }
+            self.values.update(await self._get_resource("setzone.cgi", params))
+
+        if not wanted or 'zone' not in self.values:
+            return
+        states = self.represent('zone')[1]
+        for zone_id, value in wanted.items():
+            if zone_id < len(states) and states[zone_id] != value:
+                _LOGGER.warning(
+                    "Zone %s not set to %s by %s", zone_id, value, self.device_ip
+                )
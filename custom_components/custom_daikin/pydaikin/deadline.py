@@ -0,0 +1,150 @@
+"""Time budgets for device operations and per-endpoint request timeouts."""
+
+import asyncio
+from contextvars import ContextVar
+import functools
+import logging
+from typing import Optional
+
+from .exceptions import DeadlineExceeded
+
+_LOGGER = logging.getLogger(__name__)
+
+DEFAULT_TIMEOUT = 5.0  # seconds
+MIN_TIMEOUT = 1.0  # seconds
+MAX_TIMEOUT = 10.0  # seconds
+
+_CURRENT_DEADLINE: ContextVar[Optional["Deadline"]] = ContextVar(
+    'pydaikin_deadline', default=None
+)
+
+
+class Deadline:
+    """Absolute point in (event loop) time by which an operation must be done."""
+
+    def __init__(self, budget: float) -> None:
+        self.budget = budget
+        self.expires = asyncio.get_running_loop().time() + budget
+
+    def __repr__(self) -> str:
+        return f"Deadline({self.remaining():.2f}s left of {self.budget}s)"
+
+    def remaining(self) -> float:
+        """Return the seconds left before the deadline."""
+        return max(0.0, self.expires - asyncio.get_running_loop().time())
+
+    @property
+    def expired(self) -> bool:
+        """Return True if the deadline has passed."""
+        return self.remaining() <= 0
+
+
+def current_deadline() -> Optional[Deadline]:
+    """Return the deadline of the running operation, if any."""
+    return _CURRENT_DEADLINE.get()
+
+
+def deadline_expired(retry_state=None) -> bool:  # pylint: disable=unused-argument
+    """Return True if there is no time left for another attempt (tenacity stop)."""
+    deadline = current_deadline()
+    return deadline is not None and deadline.remaining() < MIN_TIMEOUT
+
+
+def with_deadline(budget_attribute: str):
+    """Run a coroutine method within a time budget.
+
+    The budget is given with the `budget` keyword argument (in seconds) and
+    defaults to the `budget_attribute` class attribute. A nested call never gets
+    more time than the operation calling it."""
+
+    def decorator(func):
+        @functools.wraps(func)
+        async def wrapper(self, *args, budget: Optional[float] = None, **kwargs):
+            if budget is None:
+                budget = getattr(self, budget_attribute)
+            deadline = Deadline(budget)
+            outer = current_deadline()
+            if outer is not None and outer.expires < deadline.expires:
+                deadline = outer
+            token = _CURRENT_DEADLINE.set(deadline)
+            try:
+                async with asyncio.timeout_at(deadline.expires):
+                    return await func(self, *args, **kwargs)
+            finally:
+                _CURRENT_DEADLINE.reset(token)
+
+        return wrapper
+
+    return decorator
+
+
+class EndpointTimeouts:
+    """Request timeouts learned from the latency observed on each endpoint.
+
+    Like TCP retransmission timeouts, the timeout is the smoothed latency plus
+    four times its deviation, and it doubles after each timeout."""
+
+    ALPHA = 1 / 8
+    BETA = 1 / 4
+
+    def __init__(
+        self,
+        default: float = DEFAULT_TIMEOUT,
+        minimum: float = MIN_TIMEOUT,
+        maximum: float = MAX_TIMEOUT,
+    ) -> None:
+        self.default = default
+        self.minimum = minimum
+        self.maximum = maximum
+        self._srtt = {}
+        self._rttvar = {}
+        self._timeouts = {}
+
+    @staticmethod
+    def endpoint(path: str) -> str:
+        """Return the endpoint of a request path, without query string."""
+        return path.split('?', 1)[0]
+
+    def _clamp(self, value: float) -> float:
+        return min(self.maximum, max(self.minimum, value))
+
+    def timeout(self, path: str) -> float:
+        """Return the timeout of a request to this path."""
+        return self._timeouts.get(self.endpoint(path), self.default)
+
+    def observe(self, path: str, latency: float):
+        """Register the latency of a successful request."""
+        endpoint = self.endpoint(path)
+        srtt = self._srtt.get(endpoint)
+        if srtt is None:
+            srtt, rttvar = latency, latency / 2
+        else:
+            rttvar = (1 - self.BETA) * self._rttvar[endpoint] + self.BETA * abs(
+                srtt - latency
+            )
+            srtt = (1 - self.ALPHA) * srtt + self.ALPHA * latency
+        self._srtt[endpoint] = srtt
+        self._rttvar[endpoint] = rttvar
+        self._timeouts[endpoint] = self._clamp(srtt + 4 * rttvar)
+
+    def timed_out(self, path: str, timeout: float):
+        """Register a request which timed out, the next attempt will wait longer."""
+        if timeout < self.timeout(path):
+            # Cut short by the deadline, this says nothing about the endpoint
+            return
+        endpoint = self.endpoint(path)
+        self._timeouts[endpoint] = self._clamp(2 * self.timeout(path))
+        _LOGGER.debug(
+            "Timeout on %s, raising timeout to %.1fs", endpoint, self._timeouts[endpoint]
+        )
+
+    def request_timeout(self, path: str) -> float:
+        """Return the timeout of a request, bounded by the current deadline."""
+        timeout = self.timeout(path)
+        deadline = current_deadline()
+        if deadline is None:
+            return timeout
+        remaining = deadline.remaining()
+        if remaining <= 0:
+            raise DeadlineExceeded(f"No time left to request {path}")
+        return min(timeout, remaining)
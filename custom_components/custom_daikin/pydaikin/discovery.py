@@ -1,9 +1,14 @@
 """Discovery module to autodiscover Daikin devices on local network."""
 
+from datetime import datetime, timedelta, timezone
+import asyncio
+import ipaddress
 import logging
 import socket
-
-import netifaces
+import threading
+import time
+from typing import Callable, Optional
+import weakref
 
 from .response import parse_response
 
@@ -15,9 +20,176 @@ RCV_BUFSIZ = 1024
 
 GRACE_SECONDS = 1
 
+SWEEP_CONCURRENCY = 128
+SWEEP_RATE = 1000  # probes per second
+SWEEP_TIMEOUT = 2  # seconds
+
+PROBE_UDP = "udp"
+PROBE_HTTP = "http"
+
 DISCOVERY_MSG = "DAIKIN_UDP/common/basic_info"
 
 
+def get_broadcast_addresses():
+    """Return the broadcast address of every IPv4 interface of the system."""
+    import netifaces  # pylint: disable=import-outside-toplevel
+
+    # get all IPv4 definitions in the system
+    net_groups = [
+        netifaces.ifaddresses(i)[netifaces.AF_INET]
+        for i in netifaces.interfaces()
+        if netifaces.AF_INET in netifaces.ifaddresses(i)
+    ]
+
+    # flatten the previous list
+    net_ips = [item for sublist in net_groups for item in sublist]
+
+    # from those, get the broadcast IPs, if available
+    return [i['broadcast'] for i in net_ips if 'broadcast' in i.keys()]
+
+
+def parse_discovery_reply(data: bytes, addr) -> dict:
+    """Parse a discovery datagram, raise ValueError if it is not a valid reply."""
+    data = parse_response(data.decode('UTF-8'))
+
+    if 'mac' not in data:
+        raise ValueError("no mac found for device")
+
+    data.update(
+        {
+            "ip": addr[0],
+            "port": addr[1],
+        }
+    )
+    return data
+
+
+class DiscoveryCache:
+    """Process-wide cache of discovered devices, indexed by MAC, name and IP."""
+
+    # Discovered devices are trusted for this long before a rescan is needed
+    TTL = timedelta(minutes=10)
+
+    # A lookup which missed after a scan will not trigger a new scan before this delay
+    NEGATIVE_TTL = timedelta(seconds=30)
+
+    def __init__(self, ttl: timedelta = None) -> None:
+        self.ttl = ttl if ttl is not None else self.TTL
+        self._lock = threading.RLock()
+        self._scan_lock = threading.Lock()
+        self._devices = {}
+        self._last_seen = {}
+        self._mac_by_key = {}
+        self._misses = {}
+        # Running DiscoveryService, scans go through it instead of binding its port
+        self.service = None
+
+    @staticmethod
+    def _normalize(key) -> str:
+        return str(key).strip().lower()
+
+    def _is_fresh(self, timestamp) -> bool:
+        return datetime.now(timezone.utc) - timestamp < self.ttl
+
+    def update(self, device: dict):
+        """Register a discovered device."""
+        mac = self._normalize(device['mac'])
+        with self._lock:
+            old = self._devices.get(mac)
+            if old is not None:
+                # Remove stale aliases, the device may have been renamed or moved
+                for key in (old.get('name'), old.get('ip')):
+                    if key is not None:
+                        self._mac_by_key.pop(self._normalize(key), None)
+            self._devices[mac] = device
+            self._last_seen[mac] = datetime.now(timezone.utc)
+            for key in (mac, device.get('name'), device.get('ip')):
+                if key is not None:
+                    self._mac_by_key[self._normalize(key)] = mac
+                    self._misses.pop(self._normalize(key), None)
+
+    def lookup(self, key) -> Optional[dict]:
+        """Return a cached device by MAC, name or IP, None if unknown or expired."""
+        with self._lock:
+            mac = self._mac_by_key.get(self._normalize(key))
+            if mac is None or not self._is_fresh(self._last_seen[mac]):
+                return None
+            return self._devices[mac]
+
+    def devices(self) -> list:
+        """Return all cached devices which have not expired."""
+        with self._lock:
+            return [
+                device
+                for mac, device in self._devices.items()
+                if self._is_fresh(self._last_seen[mac])
+            ]
+
+    def get(self, key, stop_if_found=None) -> Optional[dict]:
+        """Return a device by MAC, name or IP, rescanning the network on a miss.
+
+        This blocks for the duration of the scan, use async_get from the loop."""
+        device = self.lookup(key)
+        if device is not None:
+            return device
+
+        normalized = self._normalize(key)
+        with self._lock:
+            last_miss = self._misses.get(normalized)
+        if (
+            last_miss is not None
+            and datetime.now(timezone.utc) - last_miss < self.NEGATIVE_TTL
+        ):
+            return None
+
+        self.scan(stop_if_found)
+
+        device = self.lookup(key)
+        if device is None:
+            now = datetime.now(timezone.utc)
+            with self._lock:
+                # Expired misses are forgotten, a new miss is recorded
+                self._misses = {
+                    k: t for k, t in self._misses.items() if now - t < self.NEGATIVE_TTL
+                }
+                self._misses[normalized] = now
+        return device
+
+    async def async_get(self, key, stop_if_found=None) -> Optional[dict]:
+        """Return a device like get, scanning in an executor."""
+        device = self.lookup(key)
+        if device is not None:
+            return device
+        return await asyncio.get_running_loop().run_in_executor(
+            None, self.get, key, stop_if_found
+        )
+
+    def scan(self, stop_if_found=None):
+        """Broadcast a discovery request and register every answering device."""
+        # Scans are serialized, the cache stays readable while one is running
+        with self._scan_lock:
+            service = self.service
+            if service is not None and service.running:
+                # The listener owns the discovery port, its replies fill the cache
+                service.broadcast_threadsafe(get_broadcast_addresses())
+                time.sleep(GRACE_SECONDS)
+            else:
+                for device in Discovery().poll(stop_if_found):
+                    self.update(device)
+        return self.devices()
+
+    def clear(self):
+        """Forget every cached device."""
+        with self._lock:
+            self._devices.clear()
+            self._last_seen.clear()
+            self._mac_by_key.clear()
+            self._misses.clear()
+
+
+DISCOVERY_CACHE = DiscoveryCache()
+
+
 class Discovery:  # pylint: disable=too-few-public-methods
     """Discovery class."""
 
@@ -36,18 +208,7 @@ class Discovery:  # pylint: disable=too-few-public-methods
         if ip:
             broadcast_ips = [ip]
         else:
-            # get all IPv4 definitions in the system
-            net_groups = [
-                netifaces.ifaddresses(i)[netifaces.AF_INET]
-                for i in netifaces.interfaces()
-                if netifaces.AF_INET in netifaces.ifaddresses(i)
-            ]
-
-            # flatten the previous list
-            net_ips = [item for sublist in net_groups for item in sublist]
-
-            # from those, get the broadcast IPs, if available
-            broadcast_ips = [i['broadcast'] for i in net_ips if 'broadcast' in i.keys()]
+            broadcast_ips = get_broadcast_addresses()
 
         # send a daikin broadcast to each one of the ips
         for ip_address in broadcast_ips:
@@ -59,17 +220,7 @@ class Discovery:  # pylint: disable=too-few-public-methods
                 _LOGGER.debug("Discovered %s, %s", addr, data.decode('UTF-8'))
 
                 try:
-                    data = parse_response(data.decode('UTF-8'))
-
-                    if 'mac' not in data:
-                        raise ValueError("no mac found for device")
-
-                    data.update(
-                        {
-                            "ip": addr[0],
-                            "port": addr[1],
-                        }
-                    )
+                    data = parse_discovery_reply(data, addr)
 
                     new_mac = data['mac']
                     self.dev[new_mac] = data
@@ -89,23 +240,348 @@ class Discovery:  # pylint: disable=too-few-public-methods
         return self.dev.values()
 
 
+class _DiscoveryProtocol(asyncio.DatagramProtocol):
+    """Datagram protocol forwarding discovery replies to a callback."""
+
+    def __init__(self, callback: Callable) -> None:
+        self._callback = callback
+
+    def datagram_received(self, data, addr):
+        self._callback(data, addr)
+
+    def error_received(self, exc):
+        _LOGGER.debug("Discovery socket error: %s", exc)
+
+
+class DiscoveryService:
+    """Long-running discovery listener tracking the IP address of each device.
+
+    Discovery requests are re-broadcast every `interval`, every reply feeds the
+    shared DiscoveryCache and the MAC-to-IP table. Registered appliances are moved
+    to their new address as soon as a reply shows that their IP has changed."""
+
+    INTERVAL = timedelta(minutes=5)
+
+    def __init__(self, interval: timedelta = None, cache: DiscoveryCache = None) -> None:
+        self.interval = interval if interval is not None else self.INTERVAL
+        self.cache = cache if cache is not None else DISCOVERY_CACHE
+        self.ip_by_mac = {}
+        self._appliances = {}
+        self._listeners = []
+        self._transport = None
+        self._loop = None
+        self._broadcast_task = None
+
+    @staticmethod
+    def _normalize_mac(mac: str) -> str:
+        return mac.replace(':', '').replace('-', '').lower()
+
+    @property
+    def running(self) -> bool:
+        """Return True if the listener is started."""
+        return self._transport is not None
+
+    async def start(self):
+        """Bind the discovery socket and start the periodic broadcast."""
+        if self.running:
+            return
+        sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+        sock.setsockopt(socket.SOL_SOCKET, socket.SO_BROADCAST, 1)
+        sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+        sock.bind(("", UDP_SRC_PORT))
+        sock.setblocking(False)
+
+        loop = asyncio.get_running_loop()
+        self._transport, _ = await loop.create_datagram_endpoint(
+            lambda: _DiscoveryProtocol(self.handle_reply), sock=sock
+        )
+        self._loop = loop
+        self._broadcast_task = loop.create_task(self._broadcast_loop())
+        self.cache.service = self
+
+    async def stop(self):
+        """Stop broadcasting and close the discovery socket."""
+        if self._broadcast_task is not None:
+            self._broadcast_task.cancel()
+            try:
+                await self._broadcast_task
+            except asyncio.CancelledError:
+                pass
+            self._broadcast_task = None
+        if self.cache.service is self:
+            self.cache.service = None
+        if self._transport is not None:
+            self._transport.close()
+            self._transport = None
+
+    def broadcast(self, ips=None):
+        """Send a discovery request, to the given IPs or to every broadcast address."""
+        if self._transport is None:
+            return
+        if ips is None:
+            ips = get_broadcast_addresses()
+        for ip_address in ips:
+            self._transport.sendto(
+                bytes(DISCOVERY_MSG, 'UTF-8'), (ip_address, UDP_DST_PORT)
+            )
+
+    def broadcast_threadsafe(self, ips=None):
+        """Send a discovery request from another thread."""
+        self._loop.call_soon_threadsafe(self.broadcast, ips)
+
+    async def _broadcast_loop(self):
+        while True:
+            try:
+                ips = await asyncio.get_running_loop().run_in_executor(
+                    None, get_broadcast_addresses
+                )
+                self.broadcast(ips)
+            except OSError as exc:
+                _LOGGER.debug("Discovery broadcast failed: %s", exc)
+            await asyncio.sleep(self.interval.total_seconds())
+
+    def register(self, appliance, mac: str = None):
+        """Track an appliance, its address will be updated when the device moves."""
+        mac = self._normalize_mac(mac or appliance.mac)
+        self._appliances.setdefault(mac, weakref.WeakSet()).add(appliance)
+        self.ip_by_mac.setdefault(mac, appliance.device_ip)
+
+    def unregister(self, appliance):
+        """Stop tracking an appliance."""
+        for mac, appliances in list(self._appliances.items()):
+            appliances.discard(appliance)
+            if not appliances:
+                del self._appliances[mac]
+
+    @property
+    def tracking(self) -> bool:
+        """Return True if some appliance is tracked."""
+        return any(self._appliances.values())
+
+    def add_listener(self, callback: Callable[[str, str, str], None]):
+        """Add a callback called with (mac, old_ip, new_ip) when a device moves."""
+        self._listeners.append(callback)
+
+    def handle_reply(self, data: bytes, addr):
+        """Process a discovery reply."""
+        try:
+            device = parse_discovery_reply(data, addr)
+        except ValueError:  # invalid message received
+            return
+        self.cache.update(device)
+
+        mac = self._normalize_mac(device['mac'])
+        old_ip = self.ip_by_mac.get(mac)
+        new_ip = device['ip']
+        self.ip_by_mac[mac] = new_ip
+        if old_ip is None or old_ip == new_ip:
+            return
+
+        _LOGGER.info("Device %s moved from %s to %s", mac, old_ip, new_ip)
+        for appliance in list(self._appliances.get(mac, ())):
+            appliance.update_device_ip(new_ip)
+        for callback in self._listeners:
+            callback(mac, old_ip, new_ip)
+
+
+class _RateLimiter:  # pylint: disable=too-few-public-methods
+    """Spread calls evenly to stay under a given rate per second."""
+
+    def __init__(self, rate: float) -> None:
+        self._interval = 1 / rate if rate else 0
+        self._next = 0.0
+
+    async def wait(self):
+        """Wait for the next available slot."""
+        if not self._interval:
+            return
+        loop = asyncio.get_running_loop()
+        now = loop.time()
+        slot = max(self._next, now)
+        self._next = slot + self._interval
+        if slot > now:
+            await asyncio.sleep(slot - now)
+
+
+def _iter_hosts(networks):
+    """Yield every host address of the given CIDR ranges."""
+    if isinstance(networks, str):
+        networks = [networks]
+    for network in networks:
+        network = ipaddress.ip_network(network, strict=False)
+        if network.num_addresses == 1:
+            yield str(network.network_address)
+        else:
+            yield from (str(host) for host in network.hosts())
+
+
+async def _sweep_udp(hosts, rate: float, grace: float):
+    """Send the discovery datagram to each host and yield replies as they arrive."""
+    loop = asyncio.get_running_loop()
+    replies = asyncio.Queue()
+    transport, _ = await loop.create_datagram_endpoint(
+        lambda: _DiscoveryProtocol(lambda data, addr: replies.put_nowait((data, addr))),
+        local_addr=("0.0.0.0", 0),
+    )
+    limiter = _RateLimiter(rate)
+
+    async def send():
+        for host in hosts:
+            await limiter.wait()
+            transport.sendto(bytes(DISCOVERY_MSG, 'UTF-8'), (host, UDP_DST_PORT))
+        await asyncio.sleep(grace)
+
+    sender = loop.create_task(send())
+    try:
+        while not sender.done() or not replies.empty():
+            getter = loop.create_task(replies.get())
+            await asyncio.wait({getter, sender}, return_when=asyncio.FIRST_COMPLETED)
+            if not getter.done():
+                getter.cancel()
+                continue
+            try:
+                yield parse_discovery_reply(*getter.result())
+            except ValueError:  # invalid message received
+                continue
+        sender.result()
+    finally:
+        sender.cancel()
+        transport.close()
+
+
+async def _probe_http(session, host: str, timeout: float) -> Optional[dict]:
+    """Probe a host over HTTP, with basic_info first and firmware 2.8.0 multireq next."""
+    # pylint: disable=import-outside-toplevel
+    from aiohttp import ClientError, ClientTimeout
+
+    from .daikin_brp_280 import DaikinBRP280
+    from .exceptions import DaikinException
+
+    client_timeout = ClientTimeout(total=timeout)
+    try:
+        async with session.get(
+            f"http://{host}/common/basic_info", timeout=client_timeout
+        ) as response:
+            if response.status == 200:
+                data = parse_response(await response.text())
+                if data.get('mac'):
+                    return {**data, "ip": host, "port": 80}
+    except (ClientError, asyncio.TimeoutError, ValueError, TypeError):
+        pass
+
+    try:
+        async with session.post(
+            f"http://{host}/dsiot/multireq",
+            json={"requests": [{"op": 2, "to": "/dsiot/edge.adp_i"}]},
+            timeout=client_timeout,
+        ) as response:
+            if response.status == 200:
+                data = await response.json(content_type=None)
+                if not isinstance(data, dict):
+                    return None
+                mac = DaikinBRP280.find_value_by_pn(
+                    data, "/dsiot/edge.adp_i", "adp_i", "mac"
+                )
+                if mac:
+                    return {"mac": mac, "ip": host, "port": 80, "ver": "2_8_0"}
+    except (
+        ClientError,
+        asyncio.TimeoutError,
+        ValueError,
+        TypeError,
+        KeyError,
+        DaikinException,
+    ):
+        pass
+
+    return None
+
+
+async def _sweep_http(hosts, concurrency: int, rate: float, timeout: float, session):
+    """Probe every host over HTTP and yield devices as they answer."""
+    # pylint: disable=import-outside-toplevel
+    from aiohttp import ClientSession
+
+    own_session = session is None
+    if own_session:
+        session = ClientSession()
+    semaphore = asyncio.Semaphore(concurrency)
+    limiter = _RateLimiter(rate)
+
+    async def probe(host):
+        async with semaphore:
+            await limiter.wait()
+            try:
+                return await _probe_http(session, host, timeout)
+            except Exception as exc:  # pylint: disable=broad-except
+                # One misbehaving host must not abort the sweep
+                _LOGGER.debug("Skipping %s, probe failed: %s", host, exc)
+                return None
+
+    tasks = [asyncio.ensure_future(probe(host)) for host in hosts]
+    try:
+        for future in asyncio.as_completed(tasks):
+            device = await future
+            if device is not None:
+                yield device
+    finally:
+        for task in tasks:
+            task.cancel()
+        if own_session:
+            await session.close()
+
+
+async def sweep(  # pylint: disable=too-many-arguments
+    networks,
+    probe: str = PROBE_UDP,
+    concurrency: int = SWEEP_CONCURRENCY,
+    rate: float = SWEEP_RATE,
+    timeout: float = SWEEP_TIMEOUT,
+    session=None,
+):
+    """Sweep CIDR ranges with unicast probes and yield devices as they answer.
+
+    Unlike broadcasts, unicast probes also reach units on routed networks. With
+    probe="udp" the discovery datagram is sent to each host, with probe="http" each
+    host is probed for common/basic_info and /dsiot/multireq. Every device found is
+    added to the shared discovery cache."""
+    hosts = list(_iter_hosts(networks))
+    if probe == PROBE_UDP:
+        devices = _sweep_udp(hosts, rate, timeout)
+    elif probe == PROBE_HTTP:
+        devices = _sweep_http(hosts, concurrency, rate, timeout, session)
+    else:
+        raise ValueError(f"Unsupported probe {probe}")
+
+    seen = set()
+    async for device in devices:
+        if device['mac'] in seen:
+            continue
+        seen.add(device['mac'])
+        DISCOVERY_CACHE.update(device)
+        yield device
+
+
 def get_devices():
     """Returns discovered devices."""
-    discovery = Discovery()
+    return DISCOVERY_CACHE.scan()
 
-    return discovery.poll()
 
+def get_device(key):
+    """Returns a discovered device by MAC, name or IP, served from the cache when possible."""
+    return DISCOVERY_CACHE.get(key, stop_if_found=key)
 
-def get_name(name):
-    """Returns the name of discovered devices."""
-    discovery = Discovery()
 
-    devices = discovery.poll(name)
+async def async_get_device(key):
+    """Returns a discovered device like get_device, without blocking the loop."""
+    return await DISCOVERY_CACHE.async_get(key, stop_if_found=key)
+
 
-    ret = None
+def get_name(name):
+    """Returns the name of discovered devices."""
+    device = get_device(name)
 
-    for device in devices:
-        if device['name'].lower() == name.lower():
-            ret = device
+    if device is not None and device.get('name', '').lower() == name.lower():
+        return device
 
-    return ret
\ No newline at end of file
+    return None
\ No newline at end of file
@@ -2,4 +2,12 @@
 
 
 class DaikinException(Exception):
-    """Daikin base exception class."""
\ No newline at end of file
+    """Daikin base exception class."""
+
+
+class DeviceUnavailable(DaikinException):
+    """Raised without contacting a device whose circuit breaker is open."""
+
+
+class DeadlineExceeded(DaikinException):
+    """Raised when the time budget of an operation is spent."""
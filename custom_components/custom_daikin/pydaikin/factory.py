@@ -1,28 +1,129 @@
 "Factory to generate Pydaikin complete objects"
 
+import asyncio
+import importlib
 import logging
 import re
-from typing import Optional, Tuple
+import socket
+from typing import TYPE_CHECKING, Callable, Optional, Tuple, Type
 
-from aiohttp import ClientSession
-from aiohttp.web_exceptions import HTTPNotFound
-
-from .daikin_airbase import DaikinAirBase
-from .daikin_base import Appliance
-from .daikin_brp069 import DaikinBRP069
-from .daikin_brp072c import DaikinBRP072C
-from .daikin_brp_280 import DaikinBRP280
-from .daikin_skyfi import DaikinSkyFi
 from .exceptions import DaikinException
-from .discovery import get_name
+
+if TYPE_CHECKING:
+    from aiohttp import ClientSession
+
+    from .daikin_base import Appliance
 
 _LOGGER = logging.getLogger(__name__)
 
 
+def firmware_version(info: dict) -> tuple:
+    """Return the adapter firmware version of discovery or basic_info data,
+    e.g. (1, 2, 51), an empty tuple if unknown."""
+    try:
+        return tuple(
+            int(part) for part in info.get('ver', '').replace('.', '_').split('_')
+        )
+    except ValueError:
+        return ()
+
+
+def _matches_brp280(info: dict) -> bool:
+    """Match adapters running firmware 2.8 or later."""
+    return firmware_version(info) >= (2, 8)
+
+
+def _matches_brp069(info: dict) -> bool:
+    """Match adapters answering with a protocol version (pv) and a firmware
+    older than 2.8."""
+    return (
+        info.get('type') == 'aircon'
+        and 'pv' in info
+        and () < firmware_version(info) < (2, 8)
+    )
+
+
+# Driver modules are only imported when a device needs them, see get_driver.
+# Fingerprints are matched in this order without importing any driver, see
+# match_driver. Drivers without fingerprint are chosen by credentials or probing.
+DRIVERS = {
+    'brp280': ('.daikin_brp_280', 'DaikinBRP280', _matches_brp280),
+    'brp069': ('.daikin_brp069', 'DaikinBRP069', _matches_brp069),
+    'airbase': ('.daikin_airbase', 'DaikinAirBase', None),
+    'brp072c': ('.daikin_brp072c', 'DaikinBRP072C', None),
+    'skyfi': ('.daikin_skyfi', 'DaikinSkyFi', None),
+}
+
+
+def register_driver(
+    name: str,
+    module: str,
+    class_name: str,
+    fingerprint: Optional[Callable[[dict], bool]] = None,
+):
+    """Add a driver, module is absolute or relative to pydaikin.
+
+    fingerprint returns True for the discovery or basic_info data of the devices
+    the driver handles."""
+    DRIVERS[name] = (module, class_name, fingerprint)
+
+
+def get_driver(name: str) -> Type['Appliance']:
+    """Return the Appliance class of a driver, importing its module."""
+    module, class_name, _ = DRIVERS[name]
+    return getattr(importlib.import_module(module, __package__), class_name)
+
+
+def driver_name(class_name: Optional[str]) -> Optional[str]:
+    """Return the name of the driver of an Appliance class, None if unknown."""
+    for name, (_, driver_class_name, _) in DRIVERS.items():
+        if driver_class_name == class_name:
+            return name
+    return None
+
+
+def create_appliance(
+    name: str,
+    device_ip: str,
+    session: Optional['ClientSession'] = None,
+    device_port: Optional[int] = None,
+    **kwargs,
+) -> 'Appliance':
+    """Return an appliance of the named driver, without contacting the device.
+
+    password is only used by skyfi, key, uuid and ssl_context by brp072c."""
+    driver = get_driver(name)
+    if name == 'skyfi':
+        return driver(device_ip, session, kwargs.get('password'))
+    if name == 'brp072c':
+        return driver(
+            device_ip,
+            session,
+            key=kwargs.get('key'),
+            uuid=kwargs.get('uuid'),
+            ssl_context=kwargs.get('ssl_context'),
+        )
+    appliance = driver(device_ip, session)
+    # BRP280 adapters only answer on the default port
+    if device_port and device_port != 80 and name != 'brp280':
+        _LOGGER.debug("Using custom port %s for %s", device_port, driver.__name__)
+        appliance.base_url = f"http://{device_ip}:{device_port}"
+    return appliance
+
+
+def match_driver(info: dict) -> Optional[str]:
+    """Return the name of the first driver whose fingerprint matches discovery or
+    basic_info data, None if none does."""
+    for name, (_, _, fingerprint) in DRIVERS.items():
+        if fingerprint is not None and fingerprint(info):
+            return name
+    return None
+
+
 class DaikinFactory:  # pylint: disable=too-few-public-methods
     "Factory object generating instantiated instances of Appliance"
 
-    _generated_object: Appliance
+    _generated_object: 'Appliance'
 
     async def __new__(cls, *a, **kw):  # pylint: disable=invalid-overridden-method
         "Return not itself, but the Appliance instanced by __init__"
@@ -33,31 +134,42 @@ class DaikinFactory:  # pylint: disable=too-few-public-methods
     async def __init__(
         self,
         device_id: str,
-        session: Optional[ClientSession] = None,
+        session: Optional['ClientSession'] = None,
         password: str = None,
         key: str = None,
         **kwargs,
     ) -> None:
-        """Factory to init the corresponding Daikin class."""
+        """Factory to init the corresponding Daikin class.
+
+        lean_transport=True sends the requests over a LeanTransport, it only
+        applies to the BRP069 family (BRP069 and AirBase) and is ignored for the
+        other drivers."""
+        # aiohttp is loaded with the drivers, not with the factory
+        from aiohttp.web_exceptions import (  # pylint: disable=import-outside-toplevel
+            HTTPNotFound,
+        )
         
         # Check if this is a device with optional port from discovery
-        device_ip, device_port = self._extract_ip_port(device_id)
+        device_ip, device_port = await extract_ip_port(device_id)
 
         if password is not None:
-            self._generated_object = DaikinSkyFi(device_ip, session, password)
+            self._generated_object = create_appliance(
+                'skyfi', device_ip, session, password=password
+            )
         elif key is not None:
-            self._generated_object = DaikinBRP072C(
-                device_ip,
-                session,
-                key=key,
-                uuid=kwargs.get('uuid'),
-                ssl_context=kwargs.get('ssl_context'),
+            self._generated_object = create_appliance(
+                'brp072c', device_ip, session, key=key, **kwargs
             )
         else:  # special case for BRP069, AirBase, and BRP firmware 2.8.0
+            if await self._init_fingerprinted(
+                device_id, device_ip, device_port, session, kwargs
+            ):
+                return
+
             # First try to check if it's firmware 2.8.0
+            _LOGGER.debug("Trying connection to firmware 2.8.0")
+            self._generated_object = create_appliance('brp280', device_ip, session)
             try:
-                _LOGGER.debug("Trying connection to firmware 2.8.0")
-                self._generated_object = DaikinBRP280(device_ip, session)
                 try:
                     await self._generated_object.update_status()
                     # If we get here, it's likely a 2.8.0 device
@@ -72,17 +184,18 @@ class DaikinFactory:  # pylint: disable=too-few-public-methods
                     raise DaikinException(f"Not a firmware 2.8.0 device: {e}")
             except (HTTPNotFound, DaikinException) as err:
                 _LOGGER.debug("Not a firmware 2.8.0 device: %s", err)
+                await self._generated_object.close()
+            except BaseException:
+                # Release the probe, e.g. its session, before giving up
+                await self._generated_object.close()
+                raise
                 
             # Try BRP069
+            _LOGGER.debug("Trying connection to BRP069")
+            self._generated_object = create_appliance(
+                'brp069', device_ip, session, device_port
+            )
             try:
-                _LOGGER.debug("Trying connection to BRP069")
-                self._generated_object = DaikinBRP069(device_ip, session)
-                
-                # If we have a specific port from discovery, set it in the base_url
-                if device_port and device_port != 80:
-                    _LOGGER.debug(f"Using custom port {device_port} for BRP069")
-                    self._generated_object.base_url = f"http://{device_ip}:{device_port}"
-                
                 await self._generated_object.update_status(
                     self._generated_object.HTTP_RESOURCES[:1]
                 )
@@ -90,37 +203,99 @@ class DaikinFactory:  # pylint: disable=too-few-public-methods
                     raise DaikinException("Empty Values.")
             except (HTTPNotFound, DaikinException) as err:
                 _LOGGER.debug("Falling back to AirBase: %s", err)
-                self._generated_object = DaikinAirBase(device_ip, session)
-                
-                # If we have a specific port from discovery, set it in the base_url
-                if device_port and device_port != 80:
-                    _LOGGER.debug(f"Using custom port {device_port} for AirBase")
-                    self._generated_object.base_url = f"http://{device_ip}:{device_port}"
+                await self._generated_object.close()
+                self._generated_object = create_appliance(
+                    'airbase', device_ip, session, device_port
+                )
+            except BaseException:
+                await self._generated_object.close()
+                raise
 
-        await self._generated_object.init()
+            if kwargs.get('lean_transport'):
+                self._generated_object.use_lean_transport()
 
-        if not self._generated_object.values.get("mode"):
-            raise DaikinException(
-                f"Error creating device, {device_id} is not supported."
-            )
+        try:
+            await self._generated_object.init()
+            if not self._generated_object.values.get("mode"):
+                raise DaikinException(
+                    f"Error creating device, {device_id} is not supported."
+                )
+        except BaseException:
+            # Stop what init started in the background, e.g. deferred resources
+            await self._generated_object.close()
+            raise
 
         _LOGGER.debug("Daikin generated object: %s", self._generated_object)
         
-    @staticmethod
-    def _extract_ip_port(device_id: str) -> Tuple[str, Optional[int]]:
-        """Extract IP and optional port from device_id string or lookup via discovery."""
-        # Check if there's a port specified in the device_id
-        port_match = re.match(r'^(.+):(\d+)$', device_id)
-        if port_match:
-            return port_match.group(1), int(port_match.group(2))
-            
-        # Try to look up device in discovery
+    async def _init_fingerprinted(  # pylint: disable=too-many-arguments
+        self, device_id, device_ip, device_port, session, kwargs
+    ) -> bool:
+        """Init the driver matching what discovery knows about the device, without
+        probing. Return False if there is none or it does not work."""
+        # pylint: disable=import-outside-toplevel
+        from aiohttp import ClientError
+        from aiohttp.web_exceptions import HTTPNotFound
+
+        from .discovery import DISCOVERY_CACHE
+
+        info = DISCOVERY_CACHE.lookup(device_ip)
+        name = match_driver(info) if info is not None else None
+        if name is None:
+            return False
+
+        _LOGGER.debug("Fingerprinted %s as %s", device_ip, name)
+        self._generated_object = create_appliance(name, device_ip, session, device_port)
+        if kwargs.get('lean_transport') and hasattr(
+            self._generated_object, 'use_lean_transport'
+        ):
+            self._generated_object.use_lean_transport()
         try:
-            device_name = get_name(device_id)
-            if device_name and 'port' in device_name:
-                return device_name['ip'], int(device_name['port'])
-        except Exception as e:
-            _LOGGER.debug(f"Error looking up device in discovery: {e}")
-            
-        # Default: just return the IP with no port
-        return device_id, None
\ No newline at end of file
+            await self._generated_object.init()
+            if not self._generated_object.values.get("mode"):
+                raise DaikinException(
+                    f"Error creating device, {device_id} is not supported."
+                )
+        except (
+            HTTPNotFound,
+            DaikinException,
+            ClientError,
+            asyncio.TimeoutError,
+        ) as err:
+            # A stale fingerprint, e.g. another adapter got the IP, probing decides
+            _LOGGER.debug("Fingerprint of %s did not work, probing: %s", device_ip, err)
+            await self._generated_object.close()
+            return False
+        except BaseException:
+            await self._generated_object.close()
+            raise
+        return True
+
+
+async def extract_ip_port(device_id: str) -> Tuple[str, Optional[int]]:
+    """Extract IP and optional port from device_id string or lookup via discovery."""
+    # Check if there's a port specified in the device_id
+    port_match = re.match(r'^(.+):(\d+)$', device_id)
+    if port_match:
+        return port_match.group(1), int(port_match.group(2))
+
+    # A plain IP address needs no lookup, the discovery port is the UDP one
+    try:
+        socket.inet_aton(device_id)
+        return device_id, None
+    except OSError:
+        pass
+
+    # Try to look up device in discovery, served from the shared cache
+    try:
+        from .discovery import (  # pylint: disable=import-outside-toplevel
+            async_get_device,
+        )
+
+        device = await async_get_device(device_id)
+        if device and 'port' in device:
+            return device['ip'], int(device['port'])
+    except Exception as e:
+        _LOGGER.debug(f"Error looking up device in discovery: {e}")
+
+    # Default: just return the IP with no port
+    return device_id, None
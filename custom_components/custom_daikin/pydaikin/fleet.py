@@ -0,0 +1,71 @@
+"""Commands sent to many appliances at once."""
+
+import asyncio
+from dataclasses import dataclass
+import logging
+import time
+from typing import AsyncIterator, Awaitable, Callable, Iterable, Optional
+
+_LOGGER = logging.getLogger(__name__)
+
+# Appliances written to at the same time across the fleet
+FLEET_CONCURRENCY = 16
+
+
+@dataclass
+class CommandResult:
+    """Outcome of a command on one appliance."""
+
+    appliance: object
+    latency: float
+    error: Optional[BaseException] = None
+
+    @property
+    def ok(self) -> bool:
+        """Return True if the command succeeded."""
+        return self.error is None
+
+
+async def bulk(
+    appliances: Iterable,
+    command: Callable[[object], Awaitable],
+    concurrency: int = FLEET_CONCURRENCY,
+) -> AsyncIterator[CommandResult]:
+    """Run a command on every appliance and yield the results as they complete.
+
+    At most `concurrency` commands run at the same time, each appliance still
+    limits its own requests to its MAX_CONCURRENT_REQUESTS. A failing appliance
+    does not stop the others, its error is in its result. Stopping the iteration
+    cancels the commands still running."""
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def run(appliance) -> CommandResult:
+        async with semaphore:
+            start = time.monotonic()
+            try:
+                await command(appliance)
+            except Exception as exc:  # pylint: disable=broad-except
+                _LOGGER.debug("Command failed on %s: %s", appliance.device_ip, exc)
+                return CommandResult(appliance, time.monotonic() - start, exc)
+            return CommandResult(appliance, time.monotonic() - start)
+
+    tasks = [asyncio.ensure_future(run(appliance)) for appliance in appliances]
+    try:
+        for next_result in asyncio.as_completed(tasks):
+            yield await next_result
+    finally:
+        for task in tasks:
+            task.cancel()
+
+
+def bulk_set(
+    appliances: Iterable,
+    settings: dict,
+    concurrency: int = FLEET_CONCURRENCY,
+) -> AsyncIterator[CommandResult]:
+    """Apply the same settings to every appliance, e.g. {'mode': 'off'}."""
+    return bulk(
+        appliances,
+        lambda appliance: appliance.set(dict(settings)),
+        concurrency=concurrency,
+    )
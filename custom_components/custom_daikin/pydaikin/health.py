@@ -0,0 +1,119 @@
+"""Per-device health tracking with a circuit breaker."""
+
+from datetime import datetime, timedelta, timezone
+import logging
+from typing import Optional
+
+from .exceptions import DeviceUnavailable
+
+_LOGGER = logging.getLogger(__name__)
+
+STATE_HEALTHY = 'healthy'
+STATE_DEGRADED = 'degraded'
+STATE_OPEN = 'open'
+STATE_HALF_OPEN = 'half_open'
+
+
+class DeviceHealth:
+    """Health state machine of one device.
+
+    A device is healthy until a request fails, degraded while failures keep
+    happening, and the circuit opens after FAILURE_THRESHOLD consecutive failures.
+    While open, requests fail immediately instead of waiting for timeouts and
+    retries. Once the open duration has elapsed the circuit is half-open: a single
+    request goes through as a probe while the others keep failing immediately, a
+    success closes the circuit and a failure opens it again for twice as long."""
+
+    FAILURE_THRESHOLD = 3
+    OPEN_DURATION = timedelta(seconds=30)
+    MAX_OPEN_DURATION = timedelta(minutes=10)
+
+    def __init__(self, name: str = '') -> None:
+        self.name = name
+        self.state = STATE_HEALTHY
+        self.consecutive_failures = 0
+        self.last_success: Optional[datetime] = None
+        self.last_failure: Optional[datetime] = None
+        self.last_error: Optional[BaseException] = None
+        self._open_duration = self.OPEN_DURATION
+        self._open_until: Optional[datetime] = None
+
+    def __repr__(self) -> str:
+        return f"DeviceHealth({self.name!r}, {self.state})"
+
+    @property
+    def available(self) -> bool:
+        """Return True if requests should be attempted now."""
+        if self.state == STATE_HALF_OPEN:
+            # The probe has not finished yet
+            return False
+        if self.state != STATE_OPEN:
+            return True
+        return datetime.now(timezone.utc) >= self._open_until
+
+    @property
+    def reachable(self) -> bool:
+        """Return False until a probe shows that an open circuit can be closed."""
+        return self.state not in (STATE_OPEN, STATE_HALF_OPEN)
+
+    @property
+    def staleness(self) -> Optional[timedelta]:
+        """Return the age of the last successful request, None if none succeeded."""
+        if self.last_success is None:
+            return None
+        return datetime.now(timezone.utc) - self.last_success
+
+    def before_request(self):
+        """Raise DeviceUnavailable while the circuit is open or being probed."""
+        if self.state == STATE_HALF_OPEN:
+            raise DeviceUnavailable(
+                f"{self.name} is unreachable, a probe is in progress"
+            ) from self.last_error
+        if self.state != STATE_OPEN:
+            return
+        if not self.available:
+            raise DeviceUnavailable(
+                f"{self.name} is unreachable, next attempt at {self._open_until}"
+            ) from self.last_error
+        _LOGGER.debug("Probing %s after %s", self.name, self._open_duration)
+        self.state = STATE_HALF_OPEN
+
+    def abort_probe(self):
+        """Let another request probe the device, the probe ended without an answer."""
+        if self.state == STATE_HALF_OPEN:
+            self.state = STATE_OPEN
+
+    def record_success(self):
+        """Register a successful request."""
+        if self.state != STATE_HEALTHY:
+            _LOGGER.info("%s is back online", self.name)
+        self.state = STATE_HEALTHY
+        self.consecutive_failures = 0
+        self.last_success = datetime.now(timezone.utc)
+        self._open_duration = self.OPEN_DURATION
+        self._open_until = None
+
+    def record_failure(self, exc: BaseException):
+        """Register a failed request."""
+        now = datetime.now(timezone.utc)
+        self.consecutive_failures += 1
+        self.last_failure = now
+        self.last_error = exc
+
+        if self.state == STATE_HALF_OPEN:
+            self._open_duration = min(self._open_duration * 2, self.MAX_OPEN_DURATION)
+        elif self.state == STATE_OPEN:
+            return
+        elif self.consecutive_failures < self.FAILURE_THRESHOLD:
+            self.state = STATE_DEGRADED
+            return
+
+        _LOGGER.warning(
+            "%s failed %s times (%s), pausing requests for %s",
+            self.name,
+            self.consecutive_failures,
+            exc,
+            self._open_duration,
+        )
+        self.state = STATE_OPEN
+        self._open_until = now + self._open_duration
@@ -0,0 +1,82 @@
+"""Cache of static device metadata, shared by all appliances of the process."""
+
+from datetime import datetime, timedelta, timezone
+import logging
+from typing import Optional
+
+_LOGGER = logging.getLogger(__name__)
+
+
+def normalize_mac(mac) -> str:
+    """Return a MAC address in lower case without separators."""
+    return str(mac).strip().lower().replace(':', '').replace('-', '')
+
+
+class MetadataCache:
+    """Resources describing the hardware (model, firmware, remote), indexed by
+    driver and MAC.
+
+    They almost never change, so they are kept for a long time and survive reloads
+    of the appliances. They are only used for a device which gave its MAC itself,
+    never to identify one. Use refresh to force them to be fetched again."""
+
+    TTL = timedelta(days=1)
+
+    def __init__(self, ttl: timedelta = None) -> None:
+        self.ttl = ttl if ttl is not None else self.TTL
+        self._entries = {}
+        self._mac_by_ip = {}
+
+    def mac_for(self, ip) -> Optional[str]:
+        """Return the MAC of the device last seen at this IP, None if unknown."""
+        from .discovery import (  # pylint: disable=import-outside-toplevel
+            DISCOVERY_CACHE,
+        )
+
+        device = DISCOVERY_CACHE.lookup(ip)
+        if device is not None and device.get('mac'):
+            return normalize_mac(device['mac'])
+        return self._mac_by_ip.get(ip)
+
+    def get(self, driver: str, mac, resource: str) -> Optional[dict]:
+        """Return a cached resource, None if unknown or expired."""
+        entry = self._entries.get((driver, normalize_mac(mac)), {}).get(resource)
+        if entry is None:
+            return None
+        timestamp, data = entry
+        if datetime.now(timezone.utc) - timestamp >= self.ttl:
+            return None
+        return data
+
+    def put(self, driver: str, mac, resource: str, data: dict, ip=None):
+        """Store a resource fetched by a driver from the device with this MAC."""
+        mac = normalize_mac(mac)
+        self._entries.setdefault((driver, mac), {})[resource] = (
+            datetime.now(timezone.utc),
+            dict(data),
+        )
+        if ip is not None:
+            self._mac_by_ip[ip] = mac
+
+    def refresh(self, mac=None, resource: str = None):
+        """Forget cached resources, of one device or all, so that they are fetched again."""
+        if mac is None:
+            self.clear()
+            return
+        mac = normalize_mac(mac)
+        for (_, entry_mac), entries in self._entries.items():
+            if entry_mac != mac:
+                continue
+            if resource is None:
+                entries.clear()
+            else:
+                entries.pop(resource, None)
+        _LOGGER.debug("Refreshing metadata %s of %s", resource or '*', mac)
+
+    def clear(self):
+        """Forget every cached resource."""
+        self._entries.clear()
+        self._mac_by_ip.clear()
+
+
+METADATA_CACHE = MetadataCache()
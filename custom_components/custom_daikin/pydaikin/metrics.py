@@ -0,0 +1,160 @@
+"""Request metrics per device and endpoint."""
+
+from bisect import bisect_left
+from collections import Counter
+from dataclasses import dataclass, field
+import logging
+from typing import Dict, Optional, Tuple
+
+_LOGGER = logging.getLogger(__name__)
+
+# Upper bounds of the latency buckets, in seconds
+LATENCY_BUCKETS = (0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+
+class LatencyHistogram:
+    """Latency histogram with fixed buckets, cheap enough to update on every request."""
+
+    __slots__ = ('buckets', 'counts', 'count', 'total', 'maximum')
+
+    def __init__(self, buckets: Tuple[float, ...] = LATENCY_BUCKETS) -> None:
+        self.buckets = buckets
+        # The last count is for latencies above the last bucket
+        self.counts = [0] * (len(buckets) + 1)
+        self.count = 0
+        self.total = 0.0
+        self.maximum = 0.0
+
+    def observe(self, latency: float):
+        """Add a latency, in seconds."""
+        self.counts[bisect_left(self.buckets, latency)] += 1
+        self.count += 1
+        self.total += latency
+        if latency > self.maximum:
+            self.maximum = latency
+
+    @property
+    def mean(self) -> Optional[float]:
+        """Return the mean latency, None if nothing was observed."""
+        return self.total / self.count if self.count else None
+
+    def percentile(self, percent: float) -> Optional[float]:
+        """Return the upper bound of the bucket holding the given percentile."""
+        if not self.count:
+            return None
+        rank = self.count * percent / 100
+        seen = 0
+        for bucket, count in zip(self.buckets, self.counts):
+            seen += count
+            if seen >= rank:
+                return bucket
+        return self.maximum
+
+    def merge(self, other: "LatencyHistogram"):
+        """Add the observations of another histogram with the same buckets."""
+        self.counts = [a + b for a, b in zip(self.counts, other.counts)]
+        self.count += other.count
+        self.total += other.total
+        self.maximum = max(self.maximum, other.maximum)
+
+    def as_dict(self) -> dict:
+        """Return the histogram as a dict."""
+        return {
+            'count': self.count,
+            'mean': self.mean,
+            'p50': self.percentile(50),
+            'p95': self.percentile(95),
+            'max': self.maximum,
+            'buckets': dict(zip((*self.buckets, float('inf')), self.counts)),
+        }
+
+
+@dataclass
+class EndpointMetrics:
+    """Metrics of the requests to one endpoint of one device."""
+
+    requests: int = 0
+    retries: int = 0
+    bytes_received: int = 0
+    errors: Counter = field(default_factory=Counter)
+    latency: LatencyHistogram = field(default_factory=LatencyHistogram)
+
+    def as_dict(self) -> dict:
+        """Return the metrics as a dict."""
+        return {
+            'requests': self.requests,
+            'retries': self.retries,
+            'bytes_received': self.bytes_received,
+            'errors': dict(self.errors),
+            'latency': self.latency.as_dict(),
+        }
+
+
+class MetricsRegistry:
+    """Registry of the request metrics of every device, by endpoint."""
+
+    def __init__(self) -> None:
+        self._metrics: Dict[Tuple[str, str], EndpointMetrics] = {}
+
+    def _get(self, device: str, endpoint: str) -> EndpointMetrics:
+        metrics = self._metrics.get((device, endpoint))
+        if metrics is None:
+            metrics = self._metrics[(device, endpoint)] = EndpointMetrics()
+        return metrics
+
+    def record(
+        self,
+        device: str,
+        endpoint: str,
+        latency: float,
+        bytes_received: int = 0,
+        error: Optional[BaseException] = None,
+    ):
+        """Record a request attempt."""
+        metrics = self._get(device, endpoint)
+        metrics.requests += 1
+        metrics.bytes_received += bytes_received
+        metrics.latency.observe(latency)
+        if error is not None:
+            metrics.errors[type(error).__name__] += 1
+
+    def record_retry(self, device: str, endpoint: str):
+        """Record that a failed request will be retried."""
+        self._get(device, endpoint).retries += 1
+
+    def endpoints(self, device: str) -> Dict[str, EndpointMetrics]:
+        """Return the metrics of a device, by endpoint."""
+        return {
+            endpoint: metrics
+            for (dev, endpoint), metrics in self._metrics.items()
+            if dev == device
+        }
+
+    def device_summary(self, device: str) -> EndpointMetrics:
+        """Return the metrics of every endpoint of a device added together."""
+        summary = EndpointMetrics()
+        for metrics in self.endpoints(device).values():
+            summary.requests += metrics.requests
+            summary.retries += metrics.retries
+            summary.bytes_received += metrics.bytes_received
+            summary.errors.update(metrics.errors)
+            summary.latency.merge(metrics.latency)
+        return summary
+
+    def snapshot(self) -> dict:
+        """Return all metrics as nested dicts, by device and endpoint."""
+        snapshot = {}
+        for (device, endpoint), metrics in self._metrics.items():
+            snapshot.setdefault(device, {})[endpoint] = metrics.as_dict()
+        return snapshot
+
+    def reset(self, device: Optional[str] = None):
+        """Forget the metrics of a device, or of every device."""
+        if device is None:
+            self._metrics.clear()
+            return
+        for key in [key for key in self._metrics if key[0] == device]:
+            del self._metrics[key]
+
+
+METRICS = MetricsRegistry()
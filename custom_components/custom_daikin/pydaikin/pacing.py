@@ -0,0 +1,74 @@
+"""Adaptive pacing of back-to-back requests to slow controllers."""
+
+import asyncio
+import logging
+import time
+from typing import Tuple, Type
+
+_LOGGER = logging.getLogger(__name__)
+
+
+class AdaptivePacer:
+    """Keep a learned minimum gap between the end of a request and the next one.
+
+    The gap shrinks a little after each streak of successful requests and doubles
+    after a failure, so it settles just above what the controller can handle. A
+    request only waits if the previous one ended less than the gap ago, idle
+    controllers are never throttled. Use it as an async context manager around
+    each request, requests are serialized."""
+
+    INITIAL_GAP = 0.3  # seconds
+    MIN_GAP = 0.0  # seconds
+    MAX_GAP = 3.0  # seconds
+    DECREASE_STEP = 0.02  # seconds
+    SUCCESS_STREAK = 5
+
+    def __init__(
+        self,
+        name: str = '',
+        gap: float = INITIAL_GAP,
+        errors: Tuple[Type[BaseException], ...] = (Exception,),
+    ) -> None:
+        self.name = name
+        self.gap = gap
+        self.errors = errors
+        self._lock = asyncio.Lock()
+        self._last_end = 0.0
+        self._streak = 0
+
+    def __repr__(self) -> str:
+        return f"AdaptivePacer({self.name!r}, gap={self.gap:.2f}s)"
+
+    async def __aenter__(self):
+        await self._lock.acquire()
+        try:
+            delay = self._last_end + self.gap - time.monotonic()
+            if delay > 0:
+                await asyncio.sleep(delay)
+        except BaseException:
+            self._lock.release()
+            raise
+        return self
+
+    async def __aexit__(self, exc_type, exc_value, traceback):
+        try:
+            self._last_end = time.monotonic()
+            if exc_type is None:
+                self.success()
+            elif issubclass(exc_type, self.errors):
+                self.failure()
+        finally:
+            self._lock.release()
+
+    def success(self):
+        """Register a request accepted by the controller."""
+        self._streak += 1
+        if self._streak >= self.SUCCESS_STREAK and self.gap > self.MIN_GAP:
+            self._streak = 0
+            self.gap = max(self.MIN_GAP, self.gap - self.DECREASE_STEP)
+
+    def failure(self):
+        """Register a request refused by the controller, back off."""
+        self._streak = 0
+        self.gap = min(self.MAX_GAP, max(self.gap * 2, self.DECREASE_STEP))
+        _LOGGER.debug("Request to %s failed, pacing raised to %.2fs", self.name, self.gap)
@@ -32,6 +32,7 @@ class DaikinPowerMixin:
 
     _energy_consumption_history = None
     values = None
+    capabilities = None
 
     ENERGY_CONSUMPTION_PARSERS = {
         f'{ATTR_TOTAL}_{TIME_TODAY}': EnergyConsumptionParser(
@@ -94,7 +95,7 @@ class DaikinPowerMixin:
         ) > 0
 
     def _register_energy_consumption_history(self):
-        if not self.support_energy_consumption:
+        if not self.capabilities.energy_consumption:
             return
 
         for mode in (ATTR_TOTAL, ATTR_COOL, ATTR_HEAT):
@@ -0,0 +1,208 @@
+"""On-demand profiling of the pydaikin work running on the event loop."""
+
+import asyncio
+from collections import defaultdict
+import functools
+import inspect
+import json
+import logging
+import time
+import types
+from typing import Iterable, List, Optional, Tuple
+
+_LOGGER = logging.getLogger(__name__)
+
+DEFAULT_THRESHOLD = 0.05  # seconds
+MAX_RECORDS = 100000
+
+# Methods profiled on every Appliance class by default
+DEFAULT_METHODS = (
+    'update_status',
+    'parse_response',
+    '_register_energy_consumption_history',
+)
+
+
+def _default_targets() -> List[Tuple[type, str]]:
+    """Return (class, method) of the default methods, on every driver defining them."""
+    from .daikin_base import Appliance  # pylint: disable=import-outside-toplevel
+
+    classes, pending = [], [Appliance]
+    while pending:
+        cls = pending.pop()
+        classes.extend(c for c in cls.__mro__ if c is not object and c not in classes)
+        pending.extend(cls.__subclasses__())
+    return [
+        (cls, name) for cls in classes for name in DEFAULT_METHODS if name in cls.__dict__
+    ]
+
+
+@types.coroutine
+def _timed(coro, on_done):
+    """Await a coroutine, timing only the steps it runs on the event loop.
+
+    The time spent waiting on the network or on other tasks between the steps
+    is not counted. on_done is called with the busy time."""
+    busy = 0.0
+    value, error = None, None
+    try:
+        while True:
+            step = time.perf_counter()
+            try:
+                if error is not None:
+                    yielded = coro.throw(error)
+                else:
+                    yielded = coro.send(value)
+            except StopIteration as stop:
+                return stop.value
+            finally:
+                busy += time.perf_counter() - step
+            value, error = None, None
+            try:
+                value = yield yielded
+            except GeneratorExit:
+                coro.close()
+                raise
+            except BaseException as exc:  # pylint: disable=broad-except
+                error = exc
+    finally:
+        on_done(busy)
+
+
+class Profiler:
+    """Record the event loop time of selected methods during a time window.
+
+    Methods are only wrapped while profiling is running, so the profiler costs
+    nothing when disabled. For coroutines only the steps run on the loop are
+    timed, not the awaited I/O. Calls busier than the threshold are logged at
+    debug level."""
+
+    def __init__(self) -> None:
+        self.threshold = DEFAULT_THRESHOLD
+        self.records = []
+        self._patched = []
+        self._stop_handle = None
+
+    @property
+    def enabled(self) -> bool:
+        """Return True while profiling."""
+        return bool(self._patched)
+
+    def _record(self, name: str, start: float, duration: float, is_async: bool):
+        if len(self.records) < MAX_RECORDS:
+            self.records.append((name, start, duration, is_async))
+        if duration >= self.threshold:
+            _LOGGER.debug("Slow call to %s kept the loop busy %.3fs", name, duration)
+
+    def _wrap(self, name: str, func):
+        record = self._record
+
+        if inspect.iscoroutinefunction(func):
+
+            @functools.wraps(func)
+            async def async_wrapper(*args, **kwargs):
+                start = time.perf_counter()
+                return await _timed(
+                    func(*args, **kwargs),
+                    lambda busy: record(name, start, busy, True),
+                )
+
+            return async_wrapper
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            start = time.perf_counter()
+            try:
+                return func(*args, **kwargs)
+            finally:
+                record(name, start, time.perf_counter() - start, False)
+
+        return wrapper
+
+    def _patch(self, cls: type, name: str):
+        original = cls.__dict__[name]
+        qualname = f"{cls.__name__}.{name}"
+        if isinstance(original, staticmethod):
+            wrapped = staticmethod(self._wrap(qualname, original.__func__))
+        elif isinstance(original, classmethod):
+            wrapped = classmethod(self._wrap(qualname, original.__func__))
+        else:
+            wrapped = self._wrap(qualname, original)
+        setattr(cls, name, wrapped)
+        self._patched.append((cls, name, original))
+
+    def start(
+        self,
+        duration: Optional[float] = None,
+        threshold: float = DEFAULT_THRESHOLD,
+        targets: Iterable[Tuple[type, str]] = (),
+    ):
+        """Start profiling the default methods and the given (class, method) targets."""
+        if self.enabled:
+            raise RuntimeError("Profiling already running")
+        self.threshold = threshold
+        self.records = []
+        for cls, name in [*_default_targets(), *targets]:
+            self._patch(cls, name)
+
+        if duration is not None:
+            self._stop_handle = asyncio.get_running_loop().call_later(
+                duration, self.stop
+            )
+        _LOGGER.info("Profiling %s methods", len(self._patched))
+
+    def stop(self) -> dict:
+        """Stop profiling, return the timings summary by method."""
+        if self._stop_handle is not None:
+            self._stop_handle.cancel()
+            self._stop_handle = None
+        for cls, name, original in reversed(self._patched):
+            setattr(cls, name, original)
+        self._patched = []
+        return self.summary()
+
+    def summary(self) -> dict:
+        """Return count, total and max duration by method."""
+        summary = defaultdict(lambda: {'count': 0, 'total': 0.0, 'max': 0.0})
+        for name, _, duration, _ in self.records:
+            stats = summary[name]
+            stats['count'] += 1
+            stats['total'] += duration
+            stats['max'] = max(stats['max'], duration)
+        return dict(summary)
+
+    def write(self, path: str):
+        """Write the recorded calls to a JSON lines file (blocking)."""
+        with open(path, 'w', encoding='utf-8') as file:
+            for name, start, duration, is_async in self.records:
+                file.write(
+                    json.dumps(
+                        {
+                            'name': name,
+                            'start': start,
+                            'duration': duration,
+                            'async': is_async,
+                        }
+                    )
+                )
+                file.write('\n')
+
+    async def capture(
+        self,
+        duration: float,
+        path: str,
+        threshold: float = DEFAULT_THRESHOLD,
+        targets: Iterable[Tuple[type, str]] = (),
+    ) -> dict:
+        """Profile for a time window and write the profile file, return the summary."""
+        self.start(threshold=threshold, targets=targets)
+        try:
+            await asyncio.sleep(duration)
+        finally:
+            summary = self.stop()
+        await asyncio.get_running_loop().run_in_executor(None, self.write, path)
+        _LOGGER.info("Profile of %s calls written to %s", len(self.records), path)
+        return summary
+
+
+PROFILER = Profiler()
@@ -0,0 +1,52 @@
+"""Record of the terminals registered on BRP072C adapters."""
+
+from datetime import datetime, timezone
+import logging
+from typing import Callable, Optional
+
+_LOGGER = logging.getLogger(__name__)
+
+
+class RegistrationStore:
+    """Remember which uuid has been registered on which device.
+
+    Registering a terminal is expensive for the adapter and only needed once per
+    uuid. The record only lives in memory, whoever wants it to survive restarts
+    loads it with load and is told of every change through on_change."""
+
+    def __init__(self, on_change: Optional[Callable[[], None]] = None) -> None:
+        self.on_change = on_change
+        self._registered = {}
+
+    def load(self, data: Optional[dict]):
+        """Replace the record with one returned by as_dict."""
+        self._registered = {
+            uuid: dict(devices) for uuid, devices in (data or {}).items()
+        }
+
+    def as_dict(self) -> dict:
+        """Return a copy of the record, suitable for JSON."""
+        return {uuid: dict(devices) for uuid, devices in self._registered.items()}
+
+    def _changed(self):
+        if self.on_change is not None:
+            self.on_change()
+
+    def is_registered(self, uuid: str, device: str) -> bool:
+        """Return True if the uuid is known to be registered on the device."""
+        return device in self._registered.get(uuid, {})
+
+    def add(self, uuid: str, device: str):
+        """Record a successful registration."""
+        self._registered.setdefault(uuid, {})[device] = datetime.now(
+            timezone.utc
+        ).isoformat()
+        self._changed()
+
+    def discard(self, uuid: str, device: str):
+        """Forget a registration the device does not honour anymore."""
+        if self._registered.get(uuid, {}).pop(device, None) is not None:
+            self._changed()
+
+
+REGISTRATIONS = RegistrationStore()
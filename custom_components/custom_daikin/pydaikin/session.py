@@ -0,0 +1,75 @@
+"""Shared HTTP sessions for pydaikin appliances."""
+
+import logging
+
+from aiohttp import ClientSession, TCPConnector
+
+_LOGGER = logging.getLogger(__name__)
+
+# Keep idle connections to a device open between two polls
+KEEPALIVE_TIMEOUT = 60  # seconds
+DNS_CACHE_TTL = 300  # seconds
+TOTAL_CONNECTIONS = 100
+
+
+class SessionManager:
+    """Hand out pooled ClientSessions shared by all appliances of a fleet.
+
+    Appliances are grouped by their MAX_CONCURRENT_REQUESTS so that each shared
+    connector caps the connections per host to what the driver can handle. Sessions
+    are reference counted and closed once the last appliance releases them."""
+
+    def __init__(
+        self,
+        keepalive_timeout: float = KEEPALIVE_TIMEOUT,
+        dns_cache_ttl: int = DNS_CACHE_TTL,
+        total_connections: int = TOTAL_CONNECTIONS,
+    ) -> None:
+        self.keepalive_timeout = keepalive_timeout
+        self.dns_cache_ttl = dns_cache_ttl
+        self.total_connections = total_connections
+        self._sessions = {}
+        self._users = {}
+
+    def _create_session(self, limit_per_host: int) -> ClientSession:
+        _LOGGER.debug("Creating shared session, %s connections per host", limit_per_host)
+        connector = TCPConnector(
+            limit=self.total_connections,
+            limit_per_host=limit_per_host,
+            keepalive_timeout=self.keepalive_timeout,
+            ttl_dns_cache=self.dns_cache_ttl,
+        )
+        return ClientSession(connector=connector)
+
+    def acquire(self, limit_per_host: int) -> ClientSession:
+        """Return the shared session for the given per host limit."""
+        session = self._sessions.get(limit_per_host)
+        if session is None or session.closed:
+            session = self._create_session(limit_per_host)
+            self._sessions[limit_per_host] = session
+            self._users[limit_per_host] = 0
+        self._users[limit_per_host] += 1
+        return session
+
+    async def release(self, session: ClientSession):
+        """Release a session, closing it when no appliance uses it anymore."""
+        for limit_per_host, shared in list(self._sessions.items()):
+            if shared is not session:
+                continue
+            self._users[limit_per_host] -= 1
+            if self._users[limit_per_host] <= 0:
+                del self._sessions[limit_per_host]
+                del self._users[limit_per_host]
+                await session.close()
+            return
+
+    async def close(self):
+        """Close every shared session."""
+        sessions = list(self._sessions.values())
+        self._sessions.clear()
+        self._users.clear()
+        for session in sessions:
+            await session.close()
+
+
+SESSION_MANAGER = SessionManager()
@@ -0,0 +1,91 @@
+"""Snapshots of the appliances' values, to warm start them after a restart."""
+
+from datetime import datetime, timedelta, timezone
+import logging
+from typing import Callable, Optional
+import weakref
+
+_LOGGER = logging.getLogger(__name__)
+
+
+class SnapshotStore:
+    """Last known values of each appliance, indexed by a key of the caller, e.g.
+    its config entry.
+
+    A snapshot holds the values with the resource which provided them and when,
+    so that a restored appliance only fetches the resources which are stale. Only
+    the appliances passed to track are saved, under the key given there, at most
+    once every SAVE_INTERVAL. The snapshots only live in memory, whoever wants
+    them to survive restarts loads them with load and is told of every change
+    through on_change."""
+
+    SAVE_INTERVAL = timedelta(minutes=5)
+
+    def __init__(self, on_change: Optional[Callable[[], None]] = None) -> None:
+        self.on_change = on_change
+        self._snapshots = {}
+        self._last_save = {}
+        self._tracked = weakref.WeakKeyDictionary()
+
+    def load(self, data: Optional[dict]):
+        """Replace the snapshots with the ones returned by as_dict."""
+        self._snapshots = dict(data or {})
+
+    def as_dict(self) -> dict:
+        """Return the snapshots indexed by key, suitable for JSON."""
+        return dict(self._snapshots)
+
+    def driver(self, key: str) -> Optional[str]:
+        """Return the class name of the last appliance saved under this key, if any."""
+        snapshot = self._snapshots.get(key)
+        return snapshot.get('driver') if snapshot is not None else None
+
+    def track(self, appliance, key: str):
+        """Save the snapshots of an appliance under this key from now on."""
+        self._tracked[appliance] = key
+
+    def untrack(self, appliance):
+        """Stop saving the snapshots of an appliance."""
+        self._tracked.pop(appliance, None)
+
+    def discard(self, key: str):
+        """Forget a snapshot, e.g. of a driver which does not fit the device
+        anymore, and stop saving the appliance tracked under its key."""
+        self._snapshots.pop(key, None)
+        self._last_save.pop(key, None)
+        for appliance, tracked_key in list(self._tracked.items()):
+            if tracked_key == key:
+                self.untrack(appliance)
+        if self.on_change is not None:
+            self.on_change()
+
+    def restore(self, appliance, key: str) -> bool:
+        """Fill the values of a new appliance from the snapshot of the key, if any."""
+        snapshot = self._snapshots.get(key)
+        if snapshot is None or snapshot.get('driver') != type(appliance).__name__:
+            return False
+        appliance.values.restore(snapshot['values'])
+        _LOGGER.debug(
+            "Restored %s values of %s", len(appliance.values), appliance.device_ip
+        )
+        return True
+
+    def save(self, appliance, force: bool = False):
+        """Keep the snapshot of a tracked appliance if the last one is old enough."""
+        key = self._tracked.get(appliance)
+        if key is None or not appliance.values:
+            return
+        now = datetime.now(timezone.utc)
+        last_save = self._last_save.get(key)
+        if not force and last_save is not None and now - last_save < self.SAVE_INTERVAL:
+            return
+        self._last_save[key] = now
+        self._snapshots[key] = {
+            'driver': type(appliance).__name__,
+            'values': appliance.values.snapshot(),
+        }
+        if self.on_change is not None:
+            self.on_change()
+
+
+SNAPSHOTS = SnapshotStore()
@@ -0,0 +1,197 @@
+"""Buffered time series of the sensors of many appliances."""
+
+import asyncio
+from datetime import datetime, timezone
+import gzip
+import json
+import logging
+import os
+import time
+from typing import Iterator, List
+
+_LOGGER = logging.getLogger(__name__)
+
+TIMESERIES_MAX_BYTES = 10 * 1024 * 1024
+TIMESERIES_BACKUP_COUNT = 5
+# Seconds between flushes, a full buffer is flushed earlier
+FLUSH_INTERVAL = 60
+MAX_BUFFERED_ROWS = 1000
+# Blocks of samples kept in memory while writes fail, the oldest are dropped beyond
+MAX_PENDING_BLOCKS = 10
+
+FORMAT_CSV = 'csv'
+# One gzip member per flushed block, holding one JSON object of columns
+FORMAT_COLUMNAR = 'columnar'
+
+COLUMNS = (
+    'in_temp',
+    'out_temp',
+    'cmp_freq',
+    'en_filter_sign',
+    'total_today',
+    'cool_today',
+    'heat_today',
+    'total_power',
+    'cool_energy',
+    'heat_energy',
+)
+
+
+class TimeSeriesWriter:
+    """Buffer sensor samples in memory and write them to rotating files in blocks.
+
+    add only copies the sensors of an appliance into the buffer, the buffer is
+    written by a thread every flush_interval seconds or once it holds max_rows
+    samples. Files are rotated like logs once larger than max_bytes. Samples
+    which could not be written are kept for the next flush, up to
+    MAX_PENDING_BLOCKS blocks."""
+
+    def __init__(  # pylint: disable=too-many-arguments
+        self,
+        path: str,
+        fmt: str = FORMAT_CSV,
+        flush_interval: float = FLUSH_INTERVAL,
+        max_rows: int = MAX_BUFFERED_ROWS,
+        max_bytes: int = TIMESERIES_MAX_BYTES,
+        backup_count: int = TIMESERIES_BACKUP_COUNT,
+    ) -> None:
+        if fmt not in (FORMAT_CSV, FORMAT_COLUMNAR):
+            raise ValueError(f"Unknown time series format {fmt}")
+        self.path = path
+        self.fmt = fmt
+        self.flush_interval = flush_interval
+        self.max_rows = max_rows
+        self.max_bytes = max_bytes
+        self.backup_count = backup_count
+        self._rows = []
+        self._full = asyncio.Event()
+        self._task = None
+        self._closing = False
+        self._lock = asyncio.Lock()
+
+    def __len__(self) -> int:
+        return len(self._rows)
+
+    def start(self):
+        """Start flushing in the background."""
+        if self._task is None:
+            self._closing = False
+            self._task = asyncio.create_task(self._run())
+
+    async def close(self):
+        """Stop the background flushes and write what is buffered."""
+        if self._task is not None:
+            # Let a write in progress finish instead of cancelling it midway
+            self._closing = True
+            self._full.set()
+            await self._task
+            self._task = None
+        await self.flush()
+
+    def add(self, *appliances):
+        """Buffer a sample of the sensors of each appliance."""
+        now = time.time()
+        for appliance in appliances:
+            self._rows.append((now, appliance.device_ip, dict(appliance.sensor_sample())))
+        if len(self._rows) >= self.max_rows:
+            self._full.set()
+
+    async def _run(self):
+        while not self._closing:
+            try:
+                await asyncio.wait_for(self._full.wait(), self.flush_interval)
+            except asyncio.TimeoutError:
+                pass
+            try:
+                await self.flush()
+            except Exception as exc:  # pylint: disable=broad-except
+                _LOGGER.warning("Could not write time series to %s: %s", self.path, exc)
+
+    async def flush(self):
+        """Write the buffered samples as one block, keep them if the write fails."""
+        # Written by a thread one block after the other
+        async with self._lock:
+            self._full.clear()
+            if not self._rows:
+                return
+            rows, self._rows = self._rows, []
+            if self.fmt == FORMAT_CSV:
+                data = self._encode_csv(rows)
+            else:
+                data = self._encode_columnar(rows)
+            try:
+                await asyncio.get_running_loop().run_in_executor(
+                    None, self._write, data
+                )
+            except Exception:
+                # Back in front of the samples added during the write
+                self._rows[:0] = rows
+                self._drop_oldest()
+                raise
+
+    def _drop_oldest(self):
+        excess = len(self._rows) - self.max_rows * MAX_PENDING_BLOCKS
+        if excess > 0:
+            _LOGGER.warning(
+                "Dropping %s unwritten time series samples of %s", excess, self.path
+            )
+            del self._rows[:excess]
+
+    @staticmethod
+    def _encode_csv(rows) -> bytes:
+        lines = []
+        for timestamp, ip, sample in rows:
+            lines.append(
+                ','.join(
+                    [
+                        datetime.fromtimestamp(timestamp, timezone.utc).strftime(
+                            '%Y-%m-%d %H:%M:%S'
+                        ),
+                        ip,
+                    ]
+                    + ['' if sample.get(k) is None else str(sample[k]) for k in COLUMNS]
+                )
+            )
+        return ('\n'.join(lines) + '\n').encode()
+
+    @staticmethod
+    def _encode_columnar(rows) -> bytes:
+        block = {
+            't': [round(timestamp, 3) for timestamp, _, _ in rows],
+            'ip': [ip for _, ip, _ in rows],
+        }
+        for column in COLUMNS:
+            block[column] = [sample.get(column) for _, _, sample in rows]
+        return gzip.compress(
+            json.dumps(block, separators=(',', ':'), default=str).encode() + b'\n'
+        )
+
+    def _rotate(self):
+        for i in range(self.backup_count - 1, 0, -1):
+            source = f'{self.path}.{i}'
+            if os.path.exists(source):
+                os.replace(source, f'{self.path}.{i + 1}')
+        if self.backup_count > 0:
+            os.replace(self.path, f'{self.path}.1')
+        else:
+            os.remove(self.path)
+
+    def _write(self, data: bytes):
+        if os.path.exists(self.path) and os.path.getsize(self.path) >= self.max_bytes:
+            self._rotate()
+        new = not os.path.exists(self.path) or os.path.getsize(self.path) == 0
+        with open(self.path, 'ab') as file:
+            if new and self.fmt == FORMAT_CSV:
+                file.write((','.join(('datetime', 'ip') + COLUMNS) + '\n').encode())
+            file.write(data)
+
+
+def read_columnar(path: str) -> Iterator[dict]:
+    """Yield the samples of a columnar file as dicts, in the order they were written."""
+    with gzip.open(path, 'rt', encoding='utf-8') as file:
+        for line in file:
+            block = json.loads(line)
+            columns: List[str] = list(block)
+            for values in zip(*(block[column] for column in columns)):
+                yield dict(zip(columns, values))
+
@@ -0,0 +1,156 @@
+"""Lightweight HTTP/1.1 transport for the BRP069 family GET protocol."""
+
+import asyncio
+from functools import lru_cache
+import logging
+from typing import Optional, Tuple
+from urllib.parse import quote, urlencode, urlsplit
+
+from aiohttp import ClientOSError, ServerDisconnectedError
+
+_LOGGER = logging.getLogger(__name__)
+
+ENCODED_REQUESTS_CACHE_SIZE = 256
+
+# Seconds to connect, send a request and read its response
+LEAN_TIMEOUT = 10
+
+
+@lru_cache(maxsize=ENCODED_REQUESTS_CACHE_SIZE)
+def encode_request(host: str, path: str, query: tuple = (), headers: tuple = ()) -> bytes:
+    """Return the raw bytes of a GET request, cached for the fixed polling requests."""
+    target = f"/{path}"
+    if query:
+        separator = '&' if '?' in target else '?'
+        target += separator + urlencode(query, safe="/:", quote_via=quote)
+    lines = [f"GET {target} HTTP/1.1", f"Host: {host}", "Connection: keep-alive"]
+    lines.extend(f"{name}: {value}" for name, value in headers)
+    return ("\r\n".join(lines) + "\r\n\r\n").encode('ascii')
+
+
+class LeanTransport:
+    """Minimal GET-only HTTP client keeping one persistent connection to a device.
+
+    It skips the request building and URL encoding done by aiohttp for every
+    request, which is most of the cost of polling the tiny BRP069 resources.
+    Requests are serialized on the single connection, matching the adapters which
+    only handle one request at a time."""
+
+    def __init__(self, base_url: str, timeout: float = LEAN_TIMEOUT) -> None:
+        self.timeout = timeout
+        self._bind(base_url)
+        self._lock = asyncio.Lock()
+        self._reader: Optional[asyncio.StreamReader] = None
+        self._writer: Optional[asyncio.StreamWriter] = None
+
+    def _bind(self, base_url: str):
+        url = urlsplit(base_url)
+        if url.scheme != 'http':
+            raise ValueError(f"Unsupported scheme {url.scheme}")
+        self.base_url = base_url
+        self.host = url.hostname
+        self.port = url.port or 80
+        self._host_header = url.netloc
+
+    async def rebind(self, base_url: str):
+        """Connect to a new address if the device has moved."""
+        if base_url == self.base_url:
+            return
+        await self.close()
+        self._bind(base_url)
+
+    @property
+    def connected(self) -> bool:
+        """Return True if a connection is open."""
+        return self._writer is not None and not self._writer.is_closing()
+
+    async def _connect(self):
+        self._reader, self._writer = await asyncio.open_connection(self.host, self.port)
+
+    async def close(self):
+        """Close the persistent connection."""
+        writer, self._reader, self._writer = self._writer, None, None
+        if writer is not None:
+            writer.close()
+            try:
+                await writer.wait_closed()
+            except OSError:
+                pass
+
+    async def _read_response(self) -> Tuple[int, bytes, bool]:
+        """Read a response, return status, body and whether the connection can be reused."""
+        head = await self._reader.readuntil(b"\r\n\r\n")
+        status_line, *header_lines = head.decode('latin-1').split("\r\n")
+        status = int(status_line.split(" ", 2)[1])
+        headers = {}
+        for line in header_lines:
+            if ':' in line:
+                name, value = line.split(':', 1)
+                headers[name.strip().lower()] = value.strip()
+
+        keep_alive = headers.get('connection', '').lower() != 'close'
+        if 'content-length' in headers:
+            body = await self._reader.readexactly(int(headers['content-length']))
+        elif headers.get('transfer-encoding', '').lower() == 'chunked':
+            chunks = []
+            while True:
+                size = int((await self._reader.readuntil(b"\r\n")).split(b";")[0], 16)
+                if size == 0:
+                    await self._reader.readuntil(b"\r\n")
+                    break
+                chunks.append(await self._reader.readexactly(size))
+                await self._reader.readexactly(2)
+            body = b"".join(chunks)
+        else:
+            # Body delimited by the end of the connection
+            body = await self._reader.read()
+            keep_alive = False
+        return status, body, keep_alive
+
+    async def get(
+        self,
+        path: str,
+        params: Optional[dict] = None,
+        headers: Optional[dict] = None,
+        timeout: Optional[float] = None,
+    ) -> Tuple[int, str]:
+        """Send a GET request and return the status and the decoded body.
+
+        asyncio.TimeoutError is raised if the request takes longer than timeout,
+        the transport's own timeout by default."""
+        request = encode_request(
+            self._host_header,
+            path,
+            tuple(params.items()) if params else (),
+            tuple(headers.items()) if headers else (),
+        )
+        async with self._lock:
+            try:
+                async with asyncio.timeout(timeout or self.timeout):
+                    return await self._request(request)
+            except asyncio.TimeoutError:
+                # The connection is left in an unknown state
+                await self.close()
+                raise
+
+    async def _request(self, request: bytes) -> Tuple[int, str]:
+        for attempt in range(2):
+            reused = self.connected
+            try:
+                if not reused:
+                    await self._connect()
+                self._writer.write(request)
+                await self._writer.drain()
+                status, body, keep_alive = await self._read_response()
+            except (OSError, asyncio.IncompleteReadError) as exc:
+                await self.close()
+                # An idle keep-alive connection may have been dropped by the device
+                if reused and attempt == 0:
+                    continue
+                if isinstance(exc, asyncio.IncompleteReadError):
+                    raise ServerDisconnectedError() from exc
+                raise ClientOSError(*exc.args) from exc
+            if not keep_alive:
+                await self.close()
+            return status, body.decode('utf-8', errors='replace')
+        raise ServerDisconnectedError()  # pragma: no cover
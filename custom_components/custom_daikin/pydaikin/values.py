@@ -1,6 +1,7 @@
 """Smart container for appliance's data"""
 
 from collections.abc import MutableMapping
+from contextlib import contextmanager
 from datetime import datetime, timedelta, timezone
 import logging
 
@@ -16,21 +17,27 @@ class ApplianceValues(MutableMapping):
         self._data = {}
         self._last_update_by_resource = {}
         self._resource_by_key = {}
+        # Bumped whenever a key is added or removed
+        self.keys_version = 0
+        self._tracking = True
 
     # --- Implementation of abstract methods ---
 
     def __getitem__(self, key):
         # Everytime a value is read, the associated resource is deprecated and should be updated
         resource = self._resource_by_key.get(key)
-        if resource is not None:
+        if resource is not None and self._tracking:
             self._last_update_by_resource.pop(resource, None)
         return self._data[key]
 
     def __setitem__(self, key, value):
+        if key not in self._data:
+            self.keys_version += 1
         self._data[key] = value
 
     def __delitem__(self, key):
         del self._data[key]
+        self.keys_version += 1
         if key in self._resource_by_key:
             del self._resource_by_key[key]
 
@@ -50,7 +57,7 @@ class ApplianceValues(MutableMapping):
         """Get a value and invalidate it so that the associated resource will soon be updated."""
         if key not in self._data:
             return default
-        if invalidate and key in self._resource_by_key:
+        if invalidate and self._tracking and key in self._resource_by_key:
             self._last_update_by_resource.pop(self._resource_by_key[key], None)
         return self._data[key]
 
@@ -58,6 +65,41 @@ class ApplianceValues(MutableMapping):
         """Return values' keys"""
         return self._data.keys()
 
+    @contextmanager
+    def untracked(self):
+        """Read values without marking their resources as used."""
+        tracking, self._tracking = self._tracking, False
+        try:
+            yield self
+        finally:
+            self._tracking = tracking
+
+    def snapshot(self) -> dict:
+        """Return the values, which resource provided them and when, as plain data."""
+        keys_by_resource = {}
+        for key, resource in self._resource_by_key.items():
+            keys_by_resource.setdefault(resource, []).append(key)
+        return {
+            'data': dict(self._data),
+            'resources': keys_by_resource,
+            'updated': {
+                resource: last_update.timestamp()
+                for resource, last_update in self._last_update_by_resource.items()
+            },
+        }
+
+    def restore(self, snapshot: dict):
+        """Load values saved by snapshot, resources keep their original update time."""
+        self._data.update(snapshot.get('data', {}))
+        for resource, keys in snapshot.get('resources', {}).items():
+            for key in keys:
+                self._resource_by_key[key] = resource
+        for resource, timestamp in snapshot.get('updated', {}).items():
+            self._last_update_by_resource[resource] = datetime.fromtimestamp(
+                timestamp, timezone.utc
+            )
+        self.keys_version += 1
+
     def should_resource_be_updated(self, resource: str) -> bool:
         """Returns whether a resource should be updated, considering recent use of values
         it returns."""
@@ -71,6 +113,8 @@ class ApplianceValues(MutableMapping):
 
     def update_by_resource(self, resource: str, data: dict):
         """Update the values and keep track of which resource provided them."""
+        if not data.keys() <= self._data.keys():
+            self.keys_version += 1
         self._data.update(data)
         self._last_update_by_resource[resource] = datetime.now(timezone.utc)
         for k in data.keys():
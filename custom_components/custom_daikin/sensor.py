@@ -1,17 +1,22 @@
 """Support for Daikin AC sensors."""
+import asyncio
 import logging
+from typing import Any, Dict
 
 from homeassistant.components.sensor import (
+    RestoreSensor,
     SensorDeviceClass,
     SensorEntity,
     SensorStateClass,
 )
 from homeassistant.const import (
+    EntityCategory,
     PERCENTAGE,
     POWER_KILO_WATT,
     ENERGY_KILO_WATT_HOUR,
     TEMP_CELSIUS,
     FREQUENCY_HERTZ,
+    UnitOfTime,
 )
 from homeassistant.helpers.entity import DeviceInfo
 
@@ -28,6 +33,9 @@ from .const import (
     ATTR_CURRENT_TOTAL_POWER,
     ATTR_CURRENT_COOL_POWER,
     ATTR_CURRENT_HEAT_POWER,
+    ATTR_REQUEST_ERRORS,
+    ATTR_REQUEST_LATENCY,
+    DATA_READY,
     DOMAIN,
     KEY_INSIDE_TEMPERATURE,
     KEY_OUTSIDE_TEMPERATURE,
@@ -46,6 +54,7 @@ from .const import (
     SENSOR_TYPE_ENERGY,
     SENSOR_TYPE_FREQUENCY,
 )
+from .pydaikin.metrics import METRICS
 
 _LOGGER = logging.getLogger(__name__)
 
@@ -153,9 +162,27 @@ SENSOR_TYPES = {
 }
 
 
+# Diagnostic sensors reading the request metrics of the device
+METRIC_SENSOR_TYPES = {
+    ATTR_REQUEST_LATENCY: {
+        "name": "Request Latency",
+        "state_class": SensorStateClass.MEASUREMENT,
+        "unit": UnitOfTime.MILLISECONDS,
+        "icon": "mdi:timer-outline",
+    },
+    ATTR_REQUEST_ERRORS: {
+        "name": "Request Errors",
+        "state_class": SensorStateClass.TOTAL_INCREASING,
+        "unit": None,
+        "icon": "mdi:alert-circle-outline",
+    },
+}
+
+
 async def async_setup_entry(hass, entry, async_add_entities):
     """Set up Daikin sensors based on config_entry."""
     daikin_api = hass.data[DOMAIN][entry.entry_id]
+    ready = hass.data[DOMAIN][DATA_READY][entry.entry_id]
     
     sensors = []
     
@@ -168,25 +195,31 @@ async def async_setup_entry(hass, entry, async_add_entities):
             sensors.append(
                 DaikinSensor(
                     daikin_api,
+                    ready,
                     sensor_type,
                     sensor_info,
                 )
             )
     
+    for sensor_type, sensor_info in METRIC_SENSOR_TYPES.items():
+        sensors.append(DaikinMetricSensor(daikin_api, sensor_type, sensor_info))
+    
     async_add_entities(sensors, update_before_add=True)
 
 
-class DaikinSensor(SensorEntity):
+class DaikinSensor(RestoreSensor):
     """Representation of a Daikin Sensor."""
 
     def __init__(
         self,
         api,
+        ready: asyncio.Event,
         sensor_type: str,
         sensor_info: Dict[str, Any],
     ) -> None:
         """Initialize the sensor."""
         self._api = api
+        self._ready = ready
         self._sensor_type = sensor_type
         self._sensor_info = sensor_info
         self._key = sensor_info["key"]
@@ -208,9 +241,26 @@ class DaikinSensor(SensorEntity):
             sw_version=getattr(api, "firmware_version", None),
         )
 
+    @property
+    def available(self) -> bool:
+        """Return False until the device has been initialized and while it is
+        unreachable, its values are stale."""
+        return self._ready.is_set() and self._api.available
+
+    async def async_added_to_hass(self) -> None:
+        """Show the last known value until the device has answered."""
+        await super().async_added_to_hass()
+        if self._attr_native_value is not None:
+            return
+        last_data = await self.async_get_last_sensor_data()
+        if last_data is not None:
+            self._attr_native_value = last_data.native_value
+
     async def async_update(self) -> None:
         """Retrieve latest state."""
-        await self._api.update_status()
+        # Before init the values are the ones of the snapshot
+        if self._ready.is_set():
+            await self._api.poll()
         
         # Get the value from the API
         if hasattr(self._api, self._key):
@@ -237,4 +287,58 @@ class DaikinSensor(SensorEntity):
             else:
                 self._attr_native_value = value
         else:
-            self._attr_native_value = None
\ No newline at end of file
+            self._attr_native_value = None
+
+
+class DaikinMetricSensor(SensorEntity):
+    """Diagnostic sensor exposing the request metrics of a Daikin device."""
+
+    _attr_entity_category = EntityCategory.DIAGNOSTIC
+
+    def __init__(
+        self,
+        api,
+        sensor_type: str,
+        sensor_info: Dict[str, Any],
+    ) -> None:
+        """Initialize the sensor."""
+        self._api = api
+        self._sensor_type = sensor_type
+        
+        # Set entity attributes
+        self._attr_name = f"{api.name} {sensor_info['name']}"
+        self._attr_unique_id = f"{api.mac}-{sensor_type}"
+        self._attr_state_class = sensor_info.get("state_class")
+        self._attr_native_unit_of_measurement = sensor_info.get("unit")
+        self._attr_icon = sensor_info.get("icon")
+        
+        # Set device info
+        self._attr_device_info = DeviceInfo(
+            identifiers={(DOMAIN, api.mac)},
+            name=api.name,
+            manufacturer="Daikin",
+            model=getattr(api, "model", "Unknown"),
+            sw_version=getattr(api, "firmware_version", None),
+        )
+
+    async def async_update(self) -> None:
+        """Read the latest metrics, this does not contact the device."""
+        endpoints = METRICS.endpoints(self._api.device_ip)
+        summary = METRICS.device_summary(self._api.device_ip)
+        
+        if self._sensor_type == ATTR_REQUEST_LATENCY:
+            p95 = summary.latency.percentile(95)
+            self._attr_native_value = None if p95 is None else round(p95 * 1000)
+            self._attr_extra_state_attributes = {
+                endpoint: {
+                    "requests": metrics.requests,
+                    "mean_ms": round((metrics.latency.mean or 0) * 1000, 1),
+                    "p95_ms": round((metrics.latency.percentile(95) or 0) * 1000),
+                    "retries": metrics.retries,
+                    "bytes_received": metrics.bytes_received,
+                }
+                for endpoint, metrics in endpoints.items()
+            }
+        else:
+            self._attr_native_value = sum(summary.errors.values())
+            self._attr_extra_state_attributes = dict(summary.errors)